@@ -0,0 +1,34 @@
+import streamlit as st
+
+# ================================================
+# PONTO DE ENTRADA ÚNICO (MULTIPÁGINAS)
+# ================================================
+# Cada dashboard continua sendo um script independente. O st.navigation só
+# executa o script da página aberta, então os dados e as bibliotecas de
+# gráficos/PDF das outras páginas não são carregados na inicialização.
+#
+#   streamlit run app.py
+
+st.set_page_config(
+    page_title="Redetur",
+    layout="wide",
+    page_icon="📊",
+    initial_sidebar_state="expanded"
+)
+
+PAGINAS = {
+    "Redetur": [
+        st.Page("app18.py", title="Business Intelligence", icon="📊", default=True),
+        st.Page("app9.py", title="Dashboard 2023/24", icon="📈"),
+    ],
+    "Orinter": [
+        st.Page("app1.py", title="Business Intelligence Orinter", icon="📊"),
+        st.Page("orinter.py", title="Dashboard Orinter", icon="🧳"),
+    ],
+    "Agências x Fornecedores": [
+        st.Page("streamlit_agencias_card_grafico_lado.py", title="Relatório por Agência", icon="🏢"),
+        st.Page("streamlit_agencias_comparativo_paginas.py", title="Comparativo de Agências", icon="📋"),
+    ],
+}
+
+st.navigation(PAGINAS).run()
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from redetur.schema import ORDEM_MESES, month_category
+
 # ================================================
 # CONFIGURAÇÕES GERAIS
 # ================================================
@@ -74,9 +76,6 @@ st.markdown(f"""
     </style>
 """, unsafe_allow_html=True)
 
-ORDEM_MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 
-               'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
-
 # ================================================
 # FUNÇÕES AUXILIARES
 # ================================================
@@ -286,7 +285,7 @@ def load_data():
     df_melted = df_melted[df_melted["Mês"] != "Total"]  # Remover a linha de totais
     
     # Converter meses para categoria ordenada
-    df_melted['Mês'] = pd.Categorical(df_melted['Mês'], categories=ORDEM_MESES, ordered=True)
+    df_melted['Mês'] = month_category(df_melted['Mês'])
     df_melted = df_melted.sort_values('Mês')
     
     return df, df_melted
@@ -316,7 +315,7 @@ with tab1:
     
     # Gráfico de vendas por mês (todas as agências)
     st.subheader("Vendas Mensais Consolidadas")
-    vendas_mensais = df_melted.groupby("Mês")["Vendas"].sum().reset_index()
+    vendas_mensais = df_melted.groupby("Mês", observed=True)["Vendas"].sum().reset_index()
     fig_mensal = create_corporate_bar_chart(
         vendas_mensais,
         x="Mês",
@@ -1,9 +1,19 @@
+import uuid
+from io import BytesIO
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from pyecharts.charts import Sankey
-from streamlit_echarts import st_pyecharts
-from pyecharts import options as opts
+
+from redetur.aggregations import plan_aggregations, top_n_with_others
+from redetur.blob_store import BlobStore
+from redetur.cube import filter_cells, rollup
+from redetur.dataset import MergedDataset
+from redetur.exports import available_formats, export_bytes, export_filename, export_mime
+from redetur.filters import FilterIndex
+from redetur.instrumentation import Recorder, env_enabled, instrument, record_cache, record_payload, set_provider
+from redetur.memo import LRUCache
+from redetur.schema import ORDEM_MESES
 
 # ================================================
 # CONFIGURAÇÕES GERAIS
@@ -77,27 +87,102 @@ st.markdown(f"""
     </style>
 """, unsafe_allow_html=True)
 
-ORDEM_MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 
-               'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
 
 # ================================================
 # FUNÇÕES AUXILIARES
 # ================================================
 
-@st.cache_data
-def load_data():
-    file_path = "Power_BI_Fornecedores _Agencias_2023_25.xlsx"
-    df = pd.read_excel(file_path, sheet_name="Planilha1")
-    df = df.dropna(subset=["Agencias"])
-    for col in ["Vendas", "Receita"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    if 'Tipo' not in df.columns:
-        tipos_exemplo = ['Direto', 'Online', 'Indicação', 'Corporativo', 'Promocional']
-        df['Tipo'] = pd.Series(tipos_exemplo * (len(df)//len(tipos_exemplo) + 1))[:len(df)]
-    if 'Mês' in df.columns:
-        df['Mês'] = df['Mês'].astype(str)
-    return df
+# Instrumentação opcional (?debug=1 na URL ou REDETUR_DEBUG=1): o Recorder
+# da sessão fica no session_state e só existe com a depuração ligada
+set_provider(lambda: st.session_state.get("instrumentacao"))
+
+@st.cache_resource
+def get_dataset_service():
+    # Uma cópia dos dados para o servidor inteiro: base única das planilhas
+    # 2023_24 e 2023_25 (a mais recente prevalece nas chaves repetidas),
+    # recarregada quando alguma delas muda, lendo só as linhas acrescentadas
+    return MergedDataset().service()
+
+@st.cache_resource(max_entries=2)
+def load_cube(data_version, _dataset):
+    # Cubo compartilhado entre sessões, uma vez por versão dos dados (atualizado
+    # a partir do cubo anterior quando a versão nova só acrescentou linhas)
+    return _dataset.cube()
+
+@st.cache_resource(max_entries=2)
+def load_filter_index(data_version, _dataset):
+    # Índice de linhas por valor de cada filtro da sidebar
+    return FilterIndex(_dataset.frame)
+
+@st.cache_resource
+def get_filter_cache():
+    # Resultados filtrados e agregados por seleção da sidebar (até 256 MB)
+    return LRUCache(max_bytes=256 * 1024 * 1024)
+
+@st.cache_resource
+def get_blob_store():
+    # PDFs e ZIPs gerados: até 32 MB por sessão, expiram após 30 min sem uso
+    return BlobStore(max_bytes_per_session=32 * 1024 * 1024, ttl_seconds=30 * 60)
+
+def get_session_id():
+    # Identificador da sessão no BlobStore (o session_state guarda só isso)
+    if "blob_session_id" not in st.session_state:
+        st.session_state["blob_session_id"] = uuid.uuid4().hex
+    return st.session_state["blob_session_id"]
+
+def show_blob_download(nome, label, file_name, mime):
+    # Botão de download servido do BlobStore; os bytes só vão ao navegador no clique
+    store, sessao = get_blob_store(), get_session_id()
+    if (sessao, nome) in store:
+        st.download_button(
+            label=label,
+            data=store.opener(sessao, nome),
+            file_name=file_name,
+            mime=mime,
+            key=f"download_{nome}",
+            on_click="ignore"
+        )
+
+@st.fragment
+def show_export_button(nome, label, base, df_export, chave):
+    # O arquivo só é gerado no clique e fica no cache junto dos filtros (chave)
+    formato = st.selectbox("Formato", available_formats(), key=f"formato_{nome}")
+    cache = get_filter_cache()
+    st.download_button(
+        label=label,
+        data=lambda: cache.get_or_compute((chave, f"export_{nome}", formato), lambda: export_bytes(df_export, formato)),
+        file_name=export_filename(base, formato),
+        mime=export_mime(formato),
+        key=f"download_{nome}",
+        on_click="ignore"
+    )
+
+def show_instrumentation_panel(recorder):
+    # Tempos, linhas, bytes enviados e cache do último rerun; exportação em JSONL
+    with st.expander("🛠️ Depuração: tempos por seção"):
+        ultimo = recorder.to_frame(recorder.last_run())
+        total_ms = ultimo.loc[ultimo["nivel"] == 0, "ms"].sum()
+        st.caption(f"Rerun {recorder.run}: {total_ms:,.0f} ms nas seções medidas")
+        ultimo["secao"] = ["· " * nivel + secao for nivel, secao in zip(ultimo["nivel"], ultimo["secao"])]
+        st.dataframe(
+            ultimo[["secao", "ms", "linhas", "bytes", "cache_hits", "cache_misses"]],
+            hide_index=True,
+            use_container_width=True
+        )
+        st.markdown("**Acumulado da sessão**")
+        st.dataframe(recorder.summary(), hide_index=True, use_container_width=True)
+        st.download_button(
+            label="📥 Exportar medições (JSONL)",
+            data=recorder.to_jsonl,
+            file_name="instrumentacao_redetur.jsonl",
+            mime="application/x-ndjson",
+            key="download_instrumentacao",
+            on_click="ignore"
+        )
+        if st.button("Limpar medições", key="limpar_instrumentacao"):
+            recorder.clear()
 
+@instrument("create_corporate_bar_chart", payload=True)
 def create_corporate_bar_chart(df, x, y, color, title, barmode='group', orientation='v'):
     if orientation == 'h':
         # Para gráficos horizontais, trocamos x e y
@@ -150,6 +235,7 @@ def create_corporate_bar_chart(df, x, y, color, title, barmode='group', orientat
     
     return fig
 
+@instrument("create_corporate_pie_chart", payload=True)
 def create_corporate_pie_chart(df, names, values, title):
     fig = px.pie(
         df,
@@ -167,6 +253,7 @@ def create_corporate_pie_chart(df, names, values, title):
     )
     return fig
 
+@instrument("create_podium_chart", payload=True)
 def create_podium_chart(df_ranking):
     # Pegar top 5 agências
     top_agencies = df_ranking.head(5).copy()
@@ -264,340 +351,9 @@ def display_ranking_cards(df_ranking):
                         delta=f"R$ {row['Vendas']:,.2f}"
                     )
 
-import base64
-from io import BytesIO
-from fpdf import FPDF
-import pandas as pd
-import plotly.express as px
-
-# Classe PDF personalizada para relatórios
-class PDFReport(FPDF):
-    def __init__(self, orientation='L', unit='mm', format='A4'):
-        super().__init__(orientation=orientation, unit=unit, format=format)
-        self.set_auto_page_break(auto=True, margin=15)
-    
-    def header(self):
-        self.set_font('Arial', 'B', 16)
-        self.cell(0, 10, 'Relatório Business Intelligence - Redetur', 0, 1, 'C')
-        self.ln(5)
-    
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Página {self.page_no()}', 0, 0, 'C')
-
-# Função para gerar PDF de agência em A4 paisagem
-def generate_agency_pdf(agency_name, df_agency):
-    pdf = PDFReport()
-    pdf.add_page()
-    
-    # Configurações básicas
-    pdf.set_font("Arial", size=12)
-    pdf.set_text_color(31, 119, 180)  # Azul corporativo
-    
-    # Cabeçalho do relatório
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, f"Agência: {agency_name}", ln=1)
-    pdf.set_font("Arial", size=10)
-    pdf.cell(0, 10, f"Período: {df_agency['Mês'].min()} a {df_agency['Mês'].max()}", ln=1)
-    pdf.ln(10)
-    
-    # Métricas principais
-    total_sales = df_agency['Vendas'].sum()
-    total_revenue = df_agency['Receita'].sum()
-    
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 10, "Métricas Principais:", ln=1)
-    pdf.set_font("Arial", size=10)
-    
-    col_width = pdf.w / 2.2
-    pdf.cell(col_width, 10, f"Total Vendas: R$ {total_sales:,.2f}", border=1)
-    pdf.cell(col_width, 10, f"Total Receita: R$ {total_revenue:,.2f}", border=1, ln=1)
-    pdf.ln(15)
-    
-    # Gráfico de distribuição por tipo
-    sales_by_type = df_agency.groupby('Tipo')['Vendas'].sum().reset_index()
-    if not sales_by_type.empty:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 10, "Distribuição por Tipo de Venda:", ln=1)
-        
-        fig_pie = px.pie(sales_by_type, names='Tipo', values='Vendas')
-        img_buffer = BytesIO()
-        fig_pie.write_image(img_buffer, format='png', width=500, height=300)
-        pdf.image(img_buffer, x=10, w=190)
-        pdf.ln(5)
-    
-    # Gráfico de vendas mensais
-    if 'Mês' in df_agency.columns:
-        sales_by_month = df_agency.groupby('Mês')['Vendas'].sum().reset_index()
-        
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 10, "Vendas Mensais:", ln=1)
-        
-        fig_bar = px.bar(sales_by_month, x='Mês', y='Vendas', 
-                        labels={'Vendas': 'Total (R$)', 'Mês': 'Mês'},
-                        text_auto=True)
-        
-        img_buffer = BytesIO()
-        fig_bar.write_image(img_buffer, format='png', width=500, height=300)
-        pdf.image(img_buffer, x=10, w=190)
-        pdf.ln(5)
-    
-    # Tabela de detalhes
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 10, "Detalhamento de Vendas:", ln=1)
-    
-    # Preparar dados para tabela
-    table_data = df_agency[['Mês', 'Tipo', 'Fornecedor', 'Vendas', 'Receita']]
-    table_data = table_data.sort_values(['Mês', 'Tipo'])
-    
-    # Configurar tabela
-    col_widths = [30, 40, 50, 30, 30]
-    pdf.set_font("Arial", size=8)
-    
-    # Cabeçalho da tabela
-    pdf.set_fill_color(200, 220, 255)
-    pdf.cell(col_widths[0], 8, "Mês", 1, 0, 'C', 1)
-    pdf.cell(col_widths[1], 8, "Tipo", 1, 0, 'C', 1)
-    pdf.cell(col_widths[2], 8, "Fornecedor", 1, 0, 'C', 1)
-    pdf.cell(col_widths[3], 8, "Vendas", 1, 0, 'C', 1)
-    pdf.cell(col_widths[4], 8, "Receita", 1, 1, 'C', 1)
-    
-    # Linhas da tabela
-    pdf.set_fill_color(255, 255, 255)
-    for _, row in table_data.iterrows():
-        pdf.cell(col_widths[0], 8, str(row['Mês']), 1)
-        pdf.cell(col_widths[1], 8, str(row['Tipo']), 1)
-        pdf.cell(col_widths[2], 8, str(row['Fornecedor']), 1)
-        pdf.cell(col_widths[3], 8, f"R$ {row['Vendas']:,.2f}", 1)
-        pdf.cell(col_widths[4], 8, f"R$ {row['Receita']:,.2f}", 1, 1)
-    
-    return pdf.output(dest='S').encode('latin1')
-
-# Função para gerar PDF de fornecedor em A4 paisagem
-def generate_supplier_pdf(supplier_name, df_supplier):
-    pdf = PDFReport()
-    pdf.add_page()
-    
-    # Configurações básicas
-    pdf.set_font("Arial", size=12)
-    pdf.set_text_color(31, 119, 180)  # Azul corporativo
-    
-    # Cabeçalho do relatório
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, f"Fornecedor: {supplier_name}", ln=1)
-    pdf.set_font("Arial", size=10)
-    pdf.cell(0, 10, f"Período: {df_supplier['Mês'].min()} a {df_supplier['Mês'].max()}", ln=1)
-    pdf.ln(10)
-    
-    # Métricas principais
-    total_sales = df_supplier['Vendas'].sum()
-    total_revenue = df_supplier['Receita'].sum()
-    
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 10, "Métricas Principais:", ln=1)
-    pdf.set_font("Arial", size=10)
-    
-    col_width = pdf.w / 2.2
-    pdf.cell(col_width, 10, f"Total Vendas: R$ {total_sales:,.2f}", border=1)
-    pdf.cell(col_width, 10, f"Total Receita: R$ {total_revenue:,.2f}", border=1, ln=1)
-    pdf.ln(15)
-    
-    # Gráfico de distribuição por agência
-    sales_by_agency = df_supplier.groupby('Agencias')['Vendas'].sum().reset_index()
-    if not sales_by_agency.empty:
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 10, "Distribuição por Agência:", ln=1)
-        
-        fig_pie = px.pie(sales_by_agency, names='Agencias', values='Vendas')
-        img_buffer = BytesIO()
-        fig_pie.write_image(img_buffer, format='png', width=500, height=300)
-        pdf.image(img_buffer, x=10, w=190)
-        pdf.ln(5)
-    
-    # Tabela de detalhes
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 10, "Detalhamento de Vendas:", ln=1)
-    
-    # Preparar dados para tabela
-    table_data = df_supplier[['Mês', 'Agencias', 'Tipo', 'Vendas', 'Receita']]
-    table_data = table_data.sort_values(['Mês', 'Agencias'])
-    
-    # Configurar tabela
-    col_widths = [25, 35, 30, 30, 30]
-    pdf.set_font("Arial", size=8)
-    
-    # Cabeçalho da tabela
-    pdf.set_fill_color(200, 220, 255)
-    pdf.cell(col_widths[0], 8, "Mês", 1, 0, 'C', 1)
-    pdf.cell(col_widths[1], 8, "Agência", 1, 0, 'C', 1)
-    pdf.cell(col_widths[2], 8, "Tipo", 1, 0, 'C', 1)
-    pdf.cell(col_widths[3], 8, "Vendas", 1, 0, 'C', 1)
-    pdf.cell(col_widths[4], 8, "Receita", 1, 1, 'C', 1)
-    
-    # Linhas da tabela
-    pdf.set_fill_color(255, 255, 255)
-    for _, row in table_data.iterrows():
-        pdf.cell(col_widths[0], 8, str(row['Mês']), 1)
-        pdf.cell(col_widths[1], 8, str(row['Agencias']), 1)
-        pdf.cell(col_widths[2], 8, str(row['Tipo']), 1)
-        pdf.cell(col_widths[3], 8, f"R$ {row['Vendas']:,.2f}", 1)
-        pdf.cell(col_widths[4], 8, f"R$ {row['Receita']:,.2f}", 1, 1)
-    
-    return pdf.output(dest='S').encode('latin1')
-
-# Modificar a função show_agency_details para incluir o botão de impressão
-def show_agency_details(df_filtrado):
-    st.title("📊 Detalhamento por Agência")
-    
-    # ... (código existente de filtros) ...
-    
-    for _, agency_row in df_agencies.iterrows():
-        agency_name = agency_row['Agencias']
-        total_sales = agency_row['Vendas']
-        
-        with st.expander(f"**{agency_name}** - Vendas Totais: R$ {total_sales:,.2f}", expanded=True):
-            # Botões de ação
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if st.button(f"📄 Gerar PDF - {agency_name}", key=f"pdf_agency_{agency_name}"):
-                    with st.spinner('Gerando relatório PDF...'):
-                        try:
-                            df_agency = df_filtrado[df_filtrado['Agencias'] == agency_name]
-                            pdf_bytes = generate_agency_pdf(agency_name, df_agency)
-                            
-                            b64 = base64.b64encode(pdf_bytes).decode()
-                            href = f'''
-                            <a href="data:application/pdf;base64,{b64}" 
-                               download="relatorio_{agency_name.replace(' ', '_')}.pdf"
-                               style="display: inline-block; padding: 0.5em 1em; 
-                                      background: #1F77B4; color: white; 
-                                      border-radius: 3px; text-decoration: none;">
-                               Baixar PDF (A4 Paisagem)
-                            </a>
-                            '''
-                            st.session_state[f'pdf_agency_{agency_name}'] = href
-                            st.success("PDF gerado com sucesso!")
-                        except Exception as e:
-                            st.error(f"Erro ao gerar PDF: {str(e)}")
-            
-            with col2:
-                if st.button(f"🖨️ Imprimir - {agency_name}", key=f"print_agency_{agency_name}"):
-                    if f'pdf_agency_{agency_name}' in st.session_state:
-                        st.markdown("""
-                        <script>
-                        function printPDF() {
-                            var pdfWindow = window.open("");
-                            pdfWindow.document.write(`
-                                <html>
-                                    <head>
-                                        <title>Imprimir Relatório</title>
-                                    </head>
-                                    <body>
-                                        <iframe 
-                                            src="data:application/pdf;base64,{st.session_state['pdf_agency_${agency_name}']}" 
-                                            style="width:100%; height:100vh;" 
-                                            frameborder="0">
-                                        </iframe>
-                                        <script>
-                                            setTimeout(() => {
-                                                window.frames[0].print();
-                                            }, 1000);
-                                        <\/script>
-                                    </body>
-                                </html>
-                            `);
-                        }
-                        printPDF();
-                        </script>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.warning("Gere o PDF primeiro antes de imprimir")
-            
-            # Mostrar link de download se o PDF foi gerado
-            if f'pdf_agency_{agency_name}' in st.session_state:
-                st.markdown(st.session_state[f'pdf_agency_{agency_name}'], unsafe_allow_html=True)
-            
-            # ... (restante do código existente) ...
-
-# Modificar a função show_supplier_details para incluir o botão de impressão
-def show_supplier_details(df_filtrado):
-    st.title("🏭 Detalhamento por Fornecedor")
-    
-    # ... (código existente) ...
-    
-    for _, supplier_row in df_suppliers.iterrows():
-        supplier_name = supplier_row["Fornecedor"]
-        total_sales = supplier_row["Vendas"]
-        
-        with st.expander(f"**{supplier_name}** - Vendas Totais: R$ {total_sales:,.2f}", expanded=False):
-            # Botões de ação
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if st.button(f"📄 Gerar PDF - {supplier_name}", key=f"pdf_supplier_{supplier_name}"):
-                    with st.spinner('Gerando relatório PDF...'):
-                        try:
-                            df_supplier = df_filtrado[df_filtrado['Fornecedor'] == supplier_name]
-                            pdf_bytes = generate_supplier_pdf(supplier_name, df_supplier)
-                            
-                            b64 = base64.b64encode(pdf_bytes).decode()
-                            href = f'''
-                            <a href="data:application/pdf;base64,{b64}" 
-                               download="relatorio_{supplier_name.replace(' ', '_')}.pdf"
-                               style="display: inline-block; padding: 0.5em 1em; 
-                                      background: #1F77B4; color: white; 
-                                      border-radius: 3px; text-decoration: none;">
-                               Baixar PDF (A4 Paisagem)
-                            </a>
-                            '''
-                            st.session_state[f'pdf_supplier_{supplier_name}'] = href
-                            st.success("PDF gerado com sucesso!")
-                        except Exception as e:
-                            st.error(f"Erro ao gerar PDF: {str(e)}")
-            
-            with col2:
-                if st.button(f"🖨️ Imprimir - {supplier_name}", key=f"print_supplier_{supplier_name}"):
-                    if f'pdf_supplier_{supplier_name}' in st.session_state:
-                        st.markdown("""
-                        <script>
-                        function printPDF() {
-                            var pdfWindow = window.open("");
-                            pdfWindow.document.write(`
-                                <html>
-                                    <head>
-                                        <title>Imprimir Relatório</title>
-                                    </head>
-                                    <body>
-                                        <iframe 
-                                            src="data:application/pdf;base64,{st.session_state['pdf_supplier_${supplier_name}']}" 
-                                            style="width:100%; height:100vh;" 
-                                            frameborder="0">
-                                        </iframe>
-                                        <script>
-                                            setTimeout(() => {
-                                                window.frames[0].print();
-                                            }, 1000);
-                                        <\/script>
-                                    </body>
-                                </html>
-                            `);
-                        }
-                        printPDF();
-                        </script>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.warning("Gere o PDF primeiro antes de imprimir")
-            
-            # Mostrar link de download se o PDF foi gerado
-            if f'pdf_supplier_{supplier_name}' in st.session_state:
-                st.markdown(st.session_state[f'pdf_supplier_{supplier_name}'], unsafe_allow_html=True)
-            
-            # ... (restante do código existente) ...
-
-
-def show_agency_details(df_filtrado):
+@st.fragment
+@instrument("show_agency_details")
+def show_agency_details(cubo_filtrado, df_filtrado, selecao):
     st.title("📊 Detalhamento por Agência")
     
     # Adicionar filtros adicionais
@@ -621,14 +377,35 @@ def show_agency_details(df_filtrado):
     if seguradora:
         tipos_selecionados.append("Seguradora")
     
-    df_filtrado_tipos = df_filtrado[df_filtrado["Tipo"].isin(tipos_selecionados)] if tipos_selecionados else df_filtrado
+    cubo_tipos = filter_cells(cubo_filtrado, {"Tipo": tipos_selecionados}) if tipos_selecionados else cubo_filtrado
     
-    df_agencies = df_filtrado_tipos.groupby("Agencias").agg({
-        "Vendas": "sum",
-        "Receita": "sum"
-    }).reset_index().sort_values("Vendas", ascending=False)
+    # Um único agrupamento para a página inteira; cada agência pega sua fatia por índice
+    aggs = plan_aggregations(cubo_tipos, {
+        "agencias": ["Agencias"],
+        "por_tipo": ["Agencias", "Tipo"],
+        "por_mes": ["Agencias", "Mês"],
+    })
+    df_agencies = aggs["agencias"].sort_values("Vendas", ascending=False)
+    por_tipo, por_mes = aggs["por_tipo"], aggs["por_mes"]
+    linhas_tipo = por_tipo.groupby("Agencias", observed=True).indices
+    linhas_mes = por_mes.groupby("Agencias", observed=True).indices
     
-    for _, agency_row in df_agencies.iterrows():
+    if df_agencies.empty:
+        st.warning("Nenhuma agência encontrada com os filtros atuais")
+        return
+    
+    # Paginação: só as agências da página atual montam e enviam gráficos
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        por_pagina = st.selectbox("Agências por página", options=[5, 10, 20], index=1, key="agencias_por_pagina")
+    total_paginas = (len(df_agencies) - 1) // por_pagina + 1
+    with col2:
+        pagina = st.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1, key="pagina_agencias")
+    inicio = (pagina - 1) * por_pagina
+    pagina_agencias = df_agencies.iloc[inicio:inicio + por_pagina]
+    st.caption(f"Mostrando {inicio + 1}–{inicio + len(pagina_agencias)} de {len(df_agencies)} agências")
+    
+    for _, agency_row in pagina_agencias.iterrows():
         agency_name = agency_row["Agencias"]
         total_sales = agency_row["Vendas"]
         
@@ -638,10 +415,10 @@ def show_agency_details(df_filtrado):
             
             with col1:
                 st.markdown(f"### Total Vendas")
-                st.metric("", f"R$ {total_sales:,.2f}")
+                st.metric("Total Vendas", f"R$ {total_sales:,.2f}", label_visibility="collapsed")
                 
                 st.markdown(f"### Total Receita")
-                st.metric("", f"R$ {agency_row['Receita']:,.2f}")
+                st.metric("Total Receita", f"R$ {agency_row['Receita']:,.2f}", label_visibility="collapsed")
                 
                 # Mostrar filtros aplicados
                 st.markdown("---")
@@ -649,10 +426,32 @@ def show_agency_details(df_filtrado):
                 st.markdown(f"- Consolidadora: {'✅' if consolidadora else '❌'}")
                 st.markdown(f"- Operadora: {'✅' if operadora else '❌'}")
                 st.markdown(f"- Seguradora: {'✅' if seguradora else '❌'}")
+                
+                # Relatório em PDF (usa as linhas originais da agência)
+                st.markdown("---")
+                if st.button("📄 Gerar PDF", key=f"pdf_agency_{agency_name}"):
+                    with st.spinner('Gerando relatório PDF...'):
+                        # fpdf só é importado quando algum PDF é pedido
+                        from redetur.reports import cached_report
+                        try:
+                            df_agency = df_filtrado[df_filtrado['Agencias'] == agency_name]
+                            pdf_bytes = cached_report("agencia", agency_name, df_agency, selection=selecao, data_version=DATA_VERSION)
+                            
+                            get_blob_store().put(get_session_id(), f"pdf_agency_{agency_name}", pdf_bytes)
+                            st.success("PDF gerado com sucesso!")
+                        except Exception as e:
+                            st.error(f"Erro ao gerar PDF: {str(e)}")
+                
+                # Botão de download se o PDF foi gerado (e ainda está no BlobStore)
+                show_blob_download(
+                    f"pdf_agency_{agency_name}",
+                    "📥 Baixar PDF (A4 Paisagem)",
+                    f"relatorio_{agency_name.replace(' ', '_')}.pdf",
+                    "application/pdf"
+                )
             
             with col2:
-                df_agency_type = df_filtrado_tipos[df_filtrado_tipos["Agencias"] == agency_name]
-                sales_by_type = df_agency_type.groupby("Tipo")["Vendas"].sum().reset_index()
+                sales_by_type = por_tipo.iloc[linhas_tipo.get(agency_name, [])]
                 
                 if not sales_by_type.empty:
                     fig_pie = create_corporate_pie_chart(
@@ -662,7 +461,7 @@ def show_agency_details(df_filtrado):
                         title=f"Distribuição por Tipo - {agency_name}"
                     )
                     st.plotly_chart(fig_pie, use_container_width=True, 
-                                  config={'displayModeBar': False})
+                                  config={'displayModeBar': False}, key=f"pie_agencia_{agency_name}")
                 else:
                     st.warning("Nenhum dado disponível por tipo para esta agência")
             
@@ -670,19 +469,9 @@ def show_agency_details(df_filtrado):
             st.markdown("---")
             st.subheader(f"Vendas Mensais - {agency_name}")
             
-            df_agency_month = df_filtrado_tipos[df_filtrado_tipos["Agencias"] == agency_name]
-            if not df_agency_month.empty and 'Mês' in df_agency_month.columns:
-                sales_by_month = df_agency_month.groupby("Mês")["Vendas"].sum().reset_index()
-                
-                # Ordenar os meses corretamente
-                meses_ordenados = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
-                                 'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
-                sales_by_month['Mês'] = pd.Categorical(sales_by_month['Mês'], 
-                                                      categories=meses_ordenados,
-                                                      ordered=True)
-                sales_by_month = sales_by_month.sort_values('Mês')
-                
-                # Criar gráfico de barras
+            sales_by_month = por_mes.iloc[linhas_mes.get(agency_name, [])]
+            if not sales_by_month.empty:
+                # Criar gráfico de barras (Mês já vem em ordem cronológica)
                 fig_month = px.bar(
                     sales_by_month,
                     x="Mês",
@@ -708,18 +497,30 @@ def show_agency_details(df_filtrado):
                     marker_line_color='rgb(8,48,107)',
                     marker_line_width=1.5
                 )
+                record_payload(fig_month)
                 
                 st.plotly_chart(fig_month, use_container_width=True, 
-                              config={'displayModeBar': False})
+                              config={'displayModeBar': False}, key=f"mes_agencia_{agency_name}")
             else:
                 st.warning("Nenhum dado disponível por mês para esta agência")
 
-def show_supplier_details(df_filtrado):
+@st.fragment
+@instrument("show_supplier_details")
+def show_supplier_details(cubo_filtrado, df_filtrado, selecao):
     st.title("🏭 Detalhamento por Fornecedor")
     
+    # Um único agrupamento Fornecedor x Agencias serve a página inteira
+    aggs = plan_aggregations(cubo_filtrado, {
+        "por_tipo": ["Tipo"],
+        "fornecedores": ["Fornecedor"],
+        "forn_agencia": ["Fornecedor", "Agencias"],
+    })
+    forn_agencia = aggs["forn_agencia"]
+    linhas_fornecedor = forn_agencia.groupby("Fornecedor", observed=True).indices
+    
     st.header("📈 Distribuição por Tipo de Venda")
     fig_tipo = create_corporate_bar_chart(
-        df_filtrado.groupby("Tipo")["Vendas"].sum().reset_index().sort_values("Vendas", ascending=False),
+        aggs["por_tipo"].sort_values("Vendas", ascending=False),
         x="Tipo",
         y="Vendas",
         color="Tipo",
@@ -728,14 +529,16 @@ def show_supplier_details(df_filtrado):
     st.plotly_chart(fig_tipo, use_container_width=True)
     
     st.header("🔍 Detalhes por Fornecedor")
-    df_suppliers = df_filtrado.groupby("Fornecedor").agg({
-        "Vendas": "sum",
-        "Receita": "sum"
-    }).reset_index().sort_values("Vendas", ascending=False)
+    df_suppliers = aggs["fornecedores"].sort_values("Vendas", ascending=False)
+    
+    # Limite de cards de agência por fornecedor; o restante vira "Outras agências"
+    opcoes_top = {"Top 12": 12, "Top 24": 24, "Top 48": 48, "Todas": None}
+    top_sel = st.selectbox("Agências exibidas por fornecedor", options=list(opcoes_top), index=0)
     
     for _, supplier_row in df_suppliers.iterrows():
         supplier_name = supplier_row["Fornecedor"]
         total_sales = supplier_row["Vendas"]
+        sales_by_agency = forn_agencia.iloc[linhas_fornecedor.get(supplier_name, [])]
         
         with st.expander(f"**{supplier_name}** - Vendas Totais: R$ {total_sales:,.2f}", expanded=False):
             col1, col2 = st.columns(2)
@@ -743,11 +546,30 @@ def show_supplier_details(df_filtrado):
             with col1:
                 st.metric("Total Vendas", f"R$ {total_sales:,.2f}")
                 st.metric("Total Receita", f"R$ {supplier_row['Receita']:,.2f}")
+                
+                # Relatório em PDF (usa as linhas originais do fornecedor)
+                if st.button("📄 Gerar PDF", key=f"pdf_supplier_{supplier_name}"):
+                    with st.spinner('Gerando relatório PDF...'):
+                        # fpdf só é importado quando algum PDF é pedido
+                        from redetur.reports import cached_report
+                        try:
+                            df_supplier = df_filtrado[df_filtrado['Fornecedor'] == supplier_name]
+                            pdf_bytes = cached_report("fornecedor", supplier_name, df_supplier, selection=selecao, data_version=DATA_VERSION)
+                            
+                            get_blob_store().put(get_session_id(), f"pdf_supplier_{supplier_name}", pdf_bytes)
+                            st.success("PDF gerado com sucesso!")
+                        except Exception as e:
+                            st.error(f"Erro ao gerar PDF: {str(e)}")
+                
+                # Botão de download se o PDF foi gerado (e ainda está no BlobStore)
+                show_blob_download(
+                    f"pdf_supplier_{supplier_name}",
+                    "📥 Baixar PDF (A4 Paisagem)",
+                    f"relatorio_{supplier_name.replace(' ', '_')}.pdf",
+                    "application/pdf"
+                )
             
             with col2:
-                df_supplier_agency = df_filtrado[df_filtrado["Fornecedor"] == supplier_name]
-                sales_by_agency = df_supplier_agency.groupby("Agencias")["Vendas"].sum().reset_index()
-                
                 if not sales_by_agency.empty:
                     fig = create_corporate_pie_chart(
                         sales_by_agency,
@@ -755,21 +577,75 @@ def show_supplier_details(df_filtrado):
                         values="Vendas",
                         title=f"Distribuição por Agência - {supplier_name}"
                     )
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True, key=f"pie_fornecedor_{supplier_name}")
                 else:
                     st.warning("Nenhum dado disponível por agência para este fornecedor")
             
             st.subheader(f"🔹 Vendas por Agência - {supplier_name}")
-            cols = st.columns(3)
-            agency_sales = df_supplier_agency.sort_values("Vendas", ascending=False)
+            rotulos = top_n_with_others(sales_by_agency["Agencias"], sales_by_agency["Vendas"], opcoes_top[top_sel], "Outras agências")
+            agency_sales = (
+                sales_by_agency["Vendas"].groupby(rotulos.to_numpy()).sum()
+                .sort_values(ascending=False)
+            )
+            # "Outras agências" sempre no fim da grade
+            if "Outras agências" in agency_sales.index:
+                agency_sales = pd.concat([agency_sales.drop("Outras agências"), agency_sales[["Outras agências"]]])
             
-            for idx, agency_row in agency_sales.iterrows():
+            cols = st.columns(3)
+            for idx, (agency_name, vendas) in enumerate(agency_sales.items()):
                 with cols[idx % 3]:
                     st.metric(
-                        label=agency_row["Agencias"],
-                        value=f"R$ {agency_row['Vendas']:,.2f}"
+                        label=agency_name,
+                        value=f"R$ {vendas:,.2f}"
                     )
 
+def show_batch_reports(df_filtrado, selecao):
+    # Relatórios de todas as agências/fornecedores dos filtros atuais em um ZIP
+    with st.expander("📦 Relatórios em lote (ZIP)"):
+        tipos = []
+        if st.checkbox("Agências", value=True, key="lote_agencias"):
+            tipos.append("agencia")
+        if st.checkbox("Fornecedores", value=True, key="lote_fornecedores"):
+            tipos.append("fornecedor")
+        
+        if st.button("Gerar todos os PDFs", disabled=not tipos or df_filtrado.empty):
+            barra = st.progress(0.0, text="Iniciando processos...")
+            
+            def progresso(concluidos, total, nome):
+                barra.progress(concluidos / total, text=f"{concluidos}/{total} - {nome}")
+            
+            from redetur.batch_reports import generate_reports_zip
+            
+            buffer = BytesIO()
+            resultado = generate_reports_zip(df_filtrado, buffer, kinds=tipos, progress=progresso,
+                                             selection=selecao, data_version=DATA_VERSION)
+            if not get_blob_store().put(get_session_id(), "zip_relatorios", buffer.getvalue()):
+                st.warning("ZIP maior que o limite por sessão; gere os relatórios com filtros mais restritos.")
+            
+            gerados = resultado["total"] - len(resultado["erros"])
+            st.success(f"{gerados} relatórios gerados em {resultado['segundos']:.1f}s")
+            for kind, name, erro in resultado["erros"][:5]:
+                st.error(f"Erro no relatório de {name}: {erro}")
+        
+        show_blob_download("zip_relatorios", "📥 Baixar ZIP", "relatorios_redetur.zip", "application/zip")
+
+@st.fragment
+@instrument("show_sankey")
+def show_sankey(ag_forn, forn_tipo):
+    # Limita os nós do fluxo para manter o payload do ECharts pequeno
+    opcoes_top = {"Top 10": 10, "Top 25": 25, "Top 50": 50, "Todos": None}
+    top_sel = st.selectbox("Agências/fornecedores no fluxo", options=list(opcoes_top), index=1)
+    if len(ag_forn) > 0:
+        # pyecharts/streamlit_echarts só são carregados quando o fluxo é exibido
+        from streamlit_echarts import st_pyecharts
+        from redetur.sankey import create_sankey_diagram
+        sankey_chart = create_sankey_diagram(ag_forn, forn_tipo, top_k=opcoes_top[top_sel])
+        st_pyecharts(sankey_chart)
+    else:
+        st.warning("Não há dados suficientes para exibir o gráfico Sankey com os filtros atuais.")
+
+@st.fragment
+@instrument("show_comparison")
 def show_comparison(df):
     st.title("📊 Comparativo entre Agências")
     
@@ -793,8 +669,8 @@ def show_comparison(df):
             ano_sel = st.selectbox("Ano", options=["Todos"] + anos_disponiveis)
             
             if ano_sel != "Todos":
-                meses_disponiveis = df[df["Ano"] == ano_sel]["Mês"].unique()
-                meses_ordenados = sorted(meses_disponiveis, key=lambda x: ORDEM_MESES.index(x) if x in ORDEM_MESES else len(ORDEM_MESES))
+                meses_disponiveis = df[df["Ano"] == ano_sel]["Mês"].dropna().unique()
+                meses_ordenados = list(meses_disponiveis.sort_values())
                 mes_sel = st.selectbox("Mês", options=["Todos"] + meses_ordenados)
             else:
                 mes_sel = "Todos"
@@ -818,7 +694,7 @@ def show_comparison(df):
         return
     
     if mes_sel == "Todos" and ano_sel == "Todos":
-        df_comparacao = df_filtrado.groupby(["Agencias", "Ano"])["Vendas"].sum().reset_index()
+        df_comparacao = df_filtrado.groupby(["Agencias", "Ano"], observed=True)["Vendas"].sum().reset_index()
         fig = create_corporate_bar_chart(
             df_comparacao,
             x="Ano",
@@ -827,8 +703,7 @@ def show_comparison(df):
             title=f"Comparativo Anual - Tipo: {tipo_sel}"
         )
     elif mes_sel == "Todos":
-        df_comparacao = df_filtrado.groupby(["Agencias", "Mês"])["Vendas"].sum().reset_index()
-        df_comparacao['Mês'] = pd.Categorical(df_comparacao['Mês'], categories=ORDEM_MESES, ordered=True)
+        df_comparacao = df_filtrado.groupby(["Agencias", "Mês"], observed=True)["Vendas"].sum().reset_index()
         df_comparacao = df_comparacao.sort_values('Mês')
         
         fig = create_corporate_bar_chart(
@@ -840,7 +715,7 @@ def show_comparison(df):
         )
         fig.update_xaxes(categoryorder='array', categoryarray=ORDEM_MESES)
     else:
-        df_comparacao = df_filtrado.groupby("Agencias")["Vendas"].sum().reset_index()
+        df_comparacao = df_filtrado.groupby("Agencias", observed=True)["Vendas"].sum().reset_index()
         fig = create_corporate_bar_chart(
             df_comparacao,
             x="Agencias",
@@ -869,13 +744,28 @@ def show_comparison(df):
 # LAYOUT PRINCIPAL
 # ================================================
 
+# Depuração: um Recorder por sessão, com as medições de cada rerun
+DEBUG = env_enabled() or st.query_params.get("debug") == "1"
+if DEBUG:
+    st.session_state.setdefault("instrumentacao", Recorder()).new_run()
+else:
+    st.session_state.pop("instrumentacao", None)
+
 # Carregar dados
-df = load_data()
+servico_dados = get_dataset_service()
+with instrument("load_data") as span:
+    cargas = servico_dados.loads
+    dataset = servico_dados.current()
+    DATA_VERSION = dataset.version
+    df = dataset.frame
+    cube = load_cube(DATA_VERSION, dataset)
+    filter_index = load_filter_index(DATA_VERSION, dataset)
+    span.rows = len(df)
+    span.cache(servico_dados.loads == cargas)
 
 # Calcular totais por tipo
 tipos_desejados = ["Consolidadora", "Operadora", "Seguradora", "Financeira"]
-df_tipo = df[df["Tipo"].isin(tipos_desejados)]
-totais_tipo = df_tipo.groupby("Tipo")[["Vendas", "Receita"]].sum().reset_index()
+totais_tipo = cube.query({"Tipo": tipos_desejados}, by=["Tipo"])
 
 # Sidebar
 with st.sidebar:
@@ -889,21 +779,26 @@ with st.sidebar:
     )
     
     st.markdown("## Filtros Principais")
-    agencias = df["Agencias"].dropna().unique()
-    agencia_sel = st.selectbox("Agência", options=["Todas"] + sorted(list(agencias)), index=0)
-    anos = df["Ano"].dropna().unique()
-    ano_sel = st.selectbox("Ano", options=["Todos"] + sorted(list(anos), reverse=True), index=0)
-    if ano_sel != "Todos":
-        meses_disponiveis = df[df["Ano"] == ano_sel]["Mês"].dropna().unique()
-    else:
-        meses_disponiveis = df["Mês"].dropna().unique()
-    meses_ordenados = sorted(meses_disponiveis, key=lambda x: ORDEM_MESES.index(x) if x in ORDEM_MESES else len(ORDEM_MESES))
-    mês_sel = st.selectbox("Mês", options=["Todos"] + meses_ordenados, index=0)
-    fornecedores = df["Fornecedor"].dropna().unique()
-    fornecedor_sel = st.selectbox("Fornecedor", options=["Todos"] + sorted(list(fornecedores)), index=0)
+    # Formulário: as seleções só disparam um rerun ao clicar em "Aplicar filtros".
+    # O mês lista todos os meses; o par ano/mês é conferido depois do envio
+    with st.form("filtros_principais"):
+        agencias = df["Agencias"].dropna().unique()
+        agencia_sel = st.selectbox("Agência", options=["Todas"] + sorted(list(agencias)), index=0)
+        anos = df["Ano"].dropna().unique()
+        ano_sel = st.selectbox("Ano", options=["Todos"] + sorted(list(anos), reverse=True), index=0)
+        meses_ordenados = list(cube.cells["Mês"].dropna().unique().sort_values())
+        mês_sel = st.selectbox("Mês", options=["Todos"] + meses_ordenados, index=0)
+        fornecedores = df["Fornecedor"].dropna().unique()
+        fornecedor_sel = st.selectbox("Fornecedor", options=["Todos"] + sorted(list(fornecedores)), index=0)
 
-    tipos_unicos = df["Tipo"].dropna().unique()
-    tipo_sel = st.selectbox("Tipo", options=["Todos"] + sorted(list(tipos_unicos)), index=0)
+        tipos_unicos = df["Tipo"].dropna().unique()
+        tipo_sel = st.selectbox("Tipo", options=["Todos"] + sorted(list(tipos_unicos)), index=0)
+        st.form_submit_button("Aplicar filtros", type="primary", use_container_width=True)
+
+    # Mês que não existe no ano escolhido: avisa e ignora o filtro de mês
+    if ano_sel != "Todos" and mês_sel != "Todos" and cube.filter({"Ano": ano_sel, "Mês": mês_sel}).empty:
+        st.warning(f"Não há dados de {mês_sel} em {ano_sel}; o filtro de mês foi ignorado.")
+        mês_sel = "Todos"
 
     st.markdown("---")
     st.markdown("## Totais por Tipo")
@@ -920,25 +815,47 @@ with st.sidebar:
     st.markdown(f"- Fornecedor: {fornecedor_sel}")
     st.markdown(f"- Tipo: {tipo_sel}")
 
-# Aplicação dos filtros
-df_filtrado = df.copy()
+# Seleção ativa da sidebar (dimensão -> valor), usada pelo cubo
+selecao = {}
 if agencia_sel != "Todas":
-    df_filtrado = df_filtrado[df_filtrado["Agencias"] == agencia_sel]
+    selecao["Agencias"] = agencia_sel
 if ano_sel != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["Ano"] == ano_sel]
+    selecao["Ano"] = ano_sel
 if mês_sel != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["Mês"] == mês_sel]
+    selecao["Mês"] = mês_sel
 if fornecedor_sel != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["Fornecedor"] == fornecedor_sel]
+    selecao["Fornecedor"] = fornecedor_sel
 if tipo_sel != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["Tipo"] == tipo_sel]
+    selecao["Tipo"] = tipo_sel
+
+# Tudo o que deriva dos filtros fica memorizado pela seleção completa:
+# trocar de página sem mexer nos filtros não recalcula nada
+filter_cache = get_filter_cache()
+chave_filtros = (DATA_VERSION, agencia_sel, ano_sel, mês_sel, fornecedor_sel, tipo_sel)
+
+def memo(nome, compute):
+    record_cache((chave_filtros, nome) in filter_cache)
+    return filter_cache.get_or_compute((chave_filtros, nome), compute)
+
+with instrument("filtros") as span:
+    # Células do cubo já filtradas: mesmas colunas de df_filtrado, somadas
+    cubo_filtrado = memo("cubo_filtrado", lambda: cube.filter(selecao))
+
+    # Aplicação dos filtros: interseção das linhas de cada valor selecionado
+    df_filtrado = memo("df_filtrado", lambda: filter_index.apply(selecao))
+    span.rows = len(df_filtrado)
+
+with st.sidebar:
+    show_batch_reports(df_filtrado, selecao)
 
 # Navegação entre páginas
 if page == "RANKING":
     st.title("🏆 Ranking de Agências")
     st.markdown("Top agências por volume de vendas (ordem decrescente)")
     
-    df_ranking_filtrado = df_filtrado.groupby("Agencias")["Vendas"].sum().reset_index().sort_values("Vendas", ascending=False)
+    with instrument("ranking") as span:
+        df_ranking_filtrado = memo("ranking", lambda: rollup(cubo_filtrado, ["Agencias"], ["Vendas"]).sort_values("Vendas", ascending=False))
+        span.rows = len(df_ranking_filtrado)
     
     st.subheader("Top 5 Agências")
     display_ranking_cards(df_ranking_filtrado)
@@ -978,6 +895,8 @@ if page == "RANKING":
     st.plotly_chart(fig, use_container_width=True)
     
     # Tabela de dados abaixo do gráfico
+    with instrument("tabela_ranking") as span:
+        span.add_payload(df_ranking_filtrado)
     st.dataframe(
         df_ranking_filtrado.style.format({"Vendas": "R$ {:.2f}"}),
         column_config={
@@ -988,42 +907,50 @@ if page == "RANKING":
         height=400
     )
     
-    st.download_button(
-        label="📥 Exportar Ranking",
-        data=df_ranking_filtrado.to_csv(index=False).encode('utf-8'),
-        file_name="ranking_agencias.csv",
-        mime="text/csv"
-    )
+    show_export_button("ranking", "📥 Exportar Ranking", "ranking_agencias", df_ranking_filtrado, chave_filtros)
 
 elif page == "Detalhamento Agências":
-    show_agency_details(df_filtrado)
+    show_agency_details(cubo_filtrado, df_filtrado, selecao)
 
 elif page == "Detalhamento Fornecedor":
-    show_supplier_details(df_filtrado)
+    show_supplier_details(cubo_filtrado, df_filtrado, selecao)
 
 elif page == "Comparativo":
-    show_comparison(df_filtrado)
+    show_comparison(cubo_filtrado)
 
 else:
     st.title("📊 Business Intelligence - Redetur")
     st.markdown("Análise comparativa de desempenho por fornecedor e agência")
 
+    # Todos os agregados da página saem de um único groupby
+    eixo_x = "Mês" if mês_sel == "Todos" else "Agencias"
+    plano_dashboard = {
+        "totais": [],
+        "vendas_eixo_tipo": [eixo_x, "Tipo"],
+        "vendas_por_tipo": ["Tipo"],
+        "ag_forn": ["Agencias", "Fornecedor"],
+        "forn_tipo": ["Fornecedor", "Tipo"],
+        "historico": ["Ano", "Mês"],
+        "vendas_agencia": ["Agencias"],
+        "vendas_fornecedor": ["Fornecedor"],
+    }
+    with instrument("agregados_dashboard") as span:
+        aggs = memo(f"dashboard_{eixo_x}", lambda: plan_aggregations(cubo_filtrado, plano_dashboard))
+        span.rows = len(cubo_filtrado)
+
+    totais = aggs["totais"].iloc[0]
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Vendas", f"R$ {df_filtrado['Vendas'].sum():,.2f}")
-    col2.metric("Total Receita", f"R$ {df_filtrado['Receita'].sum():,.2f}")
-    col3.metric("Fornecedores Ativos", df_filtrado['Fornecedor'].nunique())
+    col1.metric("Total Vendas", f"R$ {totais['Vendas']:,.2f}")
+    col2.metric("Total Receita", f"R$ {totais['Receita']:,.2f}")
+    col3.metric("Fornecedores Ativos", len(aggs["vendas_fornecedor"]))
 
     tab1, tab2 = st.tabs(["Visualizações", "Dados"])
 
     with tab1:
         st.subheader("Vendas por Tipo")
-        if mês_sel == "Todos":
-            df_filtrado['Mês'] = pd.Categorical(df_filtrado['Mês'], categories=ORDEM_MESES, ordered=True)
-            df_filtrado = df_filtrado.sort_values('Mês')
-        
         fig = create_corporate_bar_chart(
-            df_filtrado,
-            x="Mês" if mês_sel == "Todos" else "Agencias",
+            aggs["vendas_eixo_tipo"],
+            x=eixo_x,
             y="Vendas",
             color="Tipo",
             title=f"Distribuição por Tipo ({'Todos meses' if mês_sel == 'Todos' else mês_sel})"
@@ -1033,7 +960,7 @@ else:
         st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("Totais por Tipo")
-        vendas_por_tipo = df_filtrado.groupby("Tipo")[["Vendas", "Receita"]].sum().sort_values("Vendas", ascending=False)
+        vendas_por_tipo = aggs["vendas_por_tipo"].set_index("Tipo").sort_values("Vendas", ascending=False)
         st.dataframe(
             vendas_por_tipo.style.format("{:,.2f}"),
             column_config={
@@ -1044,62 +971,11 @@ else:
         )
 
         st.subheader("Fluxo de Vendas")
-        def create_sankey_diagram(df):
-            nodes = []
-            links = []
-            agencias = df["Agencias"].unique().tolist()
-            fornecedores = df["Fornecedor"].unique().tolist()
-            tipos = df["Tipo"].unique().tolist()
-            all_nodes = agencias + fornecedores + tipos
-            nodes = [{"name": node} for node in all_nodes]
-            node_index = {node: idx for idx, node in enumerate(all_nodes)}
-            ag_forn = df.groupby(["Agencias", "Fornecedor"])["Vendas"].sum().reset_index()
-            links.extend([
-                {
-                    "source": node_index[row["Agencias"]],
-                    "target": node_index[row["Fornecedor"]],
-                    "value": float(row["Vendas"])
-                }
-                for _, row in ag_forn.iterrows()
-            ])
-            forn_tipo = df.groupby(["Fornecedor", "Tipo"])["Vendas"].sum().reset_index()
-            links.extend([
-                {
-                    "source": node_index[row["Fornecedor"]],
-                    "target": node_index[row["Tipo"]],
-                    "value": float(row["Vendas"])
-                }
-                for _, row in forn_tipo.iterrows()
-            ])
-            sankey = (
-                Sankey(init_opts=opts.InitOpts(width="100%", height="600px"))
-                .add(
-                    series_name="Fluxo de Vendas",
-                    nodes=nodes,
-                    links=links,
-                    linestyle_opt=opts.LineStyleOpts(opacity=0.2, curve=0.5, color="source"),
-                    label_opts=opts.LabelOpts(position="right"),
-                    node_gap=10,
-                )
-                .set_global_opts(
-                    title_opts=opts.TitleOpts(pos_top="5%", pos_left="center"),
-                    tooltip_opts=opts.TooltipOpts(trigger="item", trigger_on="mousemove"),
-                )
-            )
-            return sankey
-
-        if len(df_filtrado) > 0:
-            sankey_chart = create_sankey_diagram(df_filtrado)
-            st_pyecharts(sankey_chart)
-        else:
-            st.warning("Não há dados suficientes para exibir o gráfico Sankey com os filtros atuais.")
+        show_sankey(aggs["ag_forn"], aggs["forn_tipo"])
 
         st.subheader("Vendas Mensais (Histórico)")
-        df_historico = df_filtrado.groupby(["Ano", "Mês"])["Vendas"].sum().reset_index()
-        df_historico['Mês'] = pd.Categorical(df_historico['Mês'], categories=ORDEM_MESES, ordered=True)
-        df_historico = df_historico.sort_values(['Ano', 'Mês'])
         fig = create_corporate_bar_chart(
-            df_historico,
+            aggs["historico"],
             x="Mês",
             y="Vendas",
             color="Ano",
@@ -1112,7 +988,7 @@ else:
         with col1:
             if agencia_sel == "Todas":
                 fig = create_corporate_pie_chart(
-                    df_filtrado.groupby("Agencias")["Vendas"].sum().reset_index(),
+                    aggs["vendas_agencia"],
                     names="Agencias",
                     values="Vendas",
                     title="Por Agência"
@@ -1123,7 +999,7 @@ else:
         with col2:
             if fornecedor_sel == "Todos":
                 fig = create_corporate_pie_chart(
-                    df_filtrado.groupby("Fornecedor")["Vendas"].sum().reset_index(),
+                    aggs["vendas_fornecedor"],
                     names="Fornecedor",
                     values="Vendas",
                     title="Por Fornecedor"
@@ -1134,20 +1010,27 @@ else:
 
     with tab2:
         st.subheader("Dados Detalhados")
+        with instrument("tabela_dados") as span:
+            span.rows = len(df_filtrado)
+            span.add_payload(df_filtrado)
         st.dataframe(
             df_filtrado.reset_index(drop=True),
             column_config={
                 "Vendas": st.column_config.NumberColumn(format="R$ %.2f"),
-                "Receita": st.column_config.NumberColumn(format="R$ %.2f")
+                "Receita": st.column_config.NumberColumn(format="R$ %.2f"),
+                "period": None
             },
             hide_index=True,
             use_container_width=True,
             height=600
         )
-        st.download_button(
-            label="📥 Exportar dados filtrados",
-            data=df_filtrado.to_csv(index=False).encode('utf-8'),
-            file_name=f"dados_redetur_filtrados.csv",
-            mime="text/csv",
-            key="download_button"
-        )
\ No newline at end of file
+        show_export_button("dados", "📥 Exportar dados filtrados", "dados_redetur_filtrados", df_filtrado, chave_filtros)
+
+# ================================================
+# PAINEL DE DEPURAÇÃO
+# ================================================
+
+# Por último, para incluir as medições deste rerun
+if DEBUG:
+    with st.sidebar:
+        show_instrumentation_panel(st.session_state["instrumentacao"])
@@ -2,11 +2,12 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from pyecharts.charts import Sankey
-from streamlit_echarts import st_pyecharts
-from pyecharts import options as opts  # Esta é a importação correta
-from pyecharts.charts import Sankey
-from streamlit_echarts import st_pyecharts
+
+from redetur.dataset import MergedDataset
+from redetur.exports import available_formats, export_bytes, export_filename, export_mime
+from redetur.filters import FilterIndex
+from redetur.memo import LRUCache
+from redetur.schema import ORDEM_MESES
 
 
 # Configuração inicial da página
@@ -17,34 +18,33 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Ordem cronológica dos meses
-ORDEM_MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 
-               'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+# Este painel cobre 2023 e 2024 (o período da planilha 2023_24). Os dados vêm
+# da base unida do app18, lendo só as partições desses anos
+ANOS_PAINEL = [2023, 2024]
 
-# Função para carregar dados com cache
-@st.cache_data
-def load_data():
-    file_path = "Power_BI_Fornecedores _Agencias_2023_24.xlsx"
-    df = pd.read_excel(file_path, sheet_name="Planilha1")
-    df = df.dropna(subset=["Agencias"])  # remove entradas sem agência
-    
-    # Convertendo colunas numéricas
-    for col in ["Vendas", "Receita"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    
-    # Criando coluna 'Tipo' se não existir (para o exemplo)
-    if 'Tipo' not in df.columns:
-        tipos_exemplo = ['Direto', 'Online', 'Indicação', 'Corporativo', 'Promocional']
-        df['Tipo'] = pd.Series(tipos_exemplo * (len(df)//len(tipos_exemplo) + 1))[:len(df)]
-    
-    # Garantir que os meses estejam no formato correto
-    if 'Mês' in df.columns:
-        df['Mês'] = df['Mês'].astype(str)
-    
-    return df
+@st.cache_resource
+def get_base():
+    return MergedDataset()
+
+# Dados compartilhados por todas as sessões (sem cópia por sessão), uma vez por versão
+@st.cache_resource(max_entries=2)
+def load_frame(data_version):
+    return get_base().query({"Ano": ANOS_PAINEL})
+
+# Índice de linhas por valor de cada filtro, compartilhado entre sessões
+@st.cache_resource(max_entries=2)
+def load_filter_index(data_version):
+    return FilterIndex(load_frame(data_version))
+
+@st.cache_resource
+def get_export_cache():
+    # Arquivos exportados por seleção de filtros, gerados só no clique (até 128 MB)
+    return LRUCache(max_bytes=128 * 1024 * 1024, max_entries=64)
 
-# Carregar dados
-df = load_data()
+# Carregar dados: versão das planilhas por os.stat (o hash só é refeito quando uma muda)
+DATA_VERSION = get_base().version()
+df = load_frame(DATA_VERSION).copy(deep=False)  # visão rasa: alterações ficam só nesta sessão
+filter_index = load_filter_index(DATA_VERSION)
 
 # ===========================================
 # SIDEBAR - FILTROS UNIFICADOS
@@ -79,10 +79,7 @@ with st.sidebar:
         meses_disponiveis = df["Mês"].dropna().unique()
     
     # Ordenar meses cronologicamente
-    meses_ordenados = sorted(
-        meses_disponiveis,
-        key=lambda x: ORDEM_MESES.index(x) if x in ORDEM_MESES else len(ORDEM_MESES)
-    )
+    meses_ordenados = list(meses_disponiveis.sort_values())
     
     mês_sel = st.selectbox(
         "Mês", 
@@ -122,19 +119,18 @@ with st.sidebar:
 # ===========================================
 # APLICAÇÃO DOS FILTROS (PARA TODOS OS GRÁFICOS)
 # ===========================================
-df_filtrado = df.copy()
-
+selecao = {}
 if agencia_sel != "Todas":
-    df_filtrado = df_filtrado[df_filtrado["Agencias"] == agencia_sel]
-
+    selecao["Agencias"] = agencia_sel
 if ano_sel != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["Ano"] == ano_sel]
-
+    selecao["Ano"] = ano_sel
 if mês_sel != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["Mês"] == mês_sel]
-
+    selecao["Mês"] = mês_sel
 if fornecedor_sel != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["Fornecedor"] == fornecedor_sel]
+    selecao["Fornecedor"] = fornecedor_sel
+
+# Interseção das linhas de cada valor selecionado, materializada uma vez
+df_filtrado = filter_index.apply(selecao)
 
 # ===========================================
 # CONTEÚDO PRINCIPAL
@@ -157,12 +153,7 @@ with tab1:
     
     # Ordenar meses cronologicamente nos dados
     if mês_sel == "Todos":
-        df_filtrado['Mês'] = pd.Categorical(
-            df_filtrado['Mês'],
-            categories=ORDEM_MESES,
-            ordered=True
-        )
-        df_filtrado = df_filtrado.sort_values('Mês')
+        df_filtrado = df_filtrado.sort_values('period')
     
     fig = px.bar(
         df_filtrado,
@@ -188,7 +179,7 @@ with tab1:
     
     # Tabela de Totais por Tipo (abaixo do gráfico)
     st.subheader("Totais por Tipo")
-    vendas_por_tipo = df_filtrado.groupby("Tipo")[["Vendas", "Receita"]].sum().sort_values("Vendas", ascending=False)
+    vendas_por_tipo = df_filtrado.groupby("Tipo", observed=True)[["Vendas", "Receita"]].sum().sort_values("Vendas", ascending=False)
     st.dataframe(
         vendas_por_tipo.style.format("{:,.2f}"),
         column_config={
@@ -280,77 +271,17 @@ with tab1:
     
     ############################################################################
     
- # Função para criar o Sankey diagram
-def create_sankey_diagram(df):
-    # Processar os dados para criar nós e links
-    # Exemplo: Agência -> Fornecedor -> Tipo
-    nodes = []
-    links = []
-    
-    # Mapear categorias únicas para nós
-    agencias = df["Agencias"].unique().tolist()
-    fornecedores = df["Fornecedor"].unique().tolist()
-    tipos = df["Tipo"].unique().tolist()
-    
-    # Criar lista de nós com índices
-    all_nodes = agencias + fornecedores + tipos
-    nodes = [{"name": node} for node in all_nodes]
-    
-    # Mapear nomes para índices
-    node_index = {node: idx for idx, node in enumerate(all_nodes)}
-    
-    # Criar links entre as categorias
-    # Agência -> Fornecedor
-    ag_forn = df.groupby(["Agencias", "Fornecedor"])["Vendas"].sum().reset_index()
-    links.extend([
-        {
-            "source": node_index[row["Agencias"]],
-            "target": node_index[row["Fornecedor"]],
-            "value": float(row["Vendas"])
-        }
-        for _, row in ag_forn.iterrows()
-    ])
-    
-    # Fornecedor -> Tipo
-    forn_tipo = df.groupby(["Fornecedor", "Tipo"])["Vendas"].sum().reset_index()
-    links.extend([
-        {
-            "source": node_index[row["Fornecedor"]],
-            "target": node_index[row["Tipo"]],
-            "value": float(row["Vendas"])
-        }
-        for _, row in forn_tipo.iterrows()
-    ])
-    
-    # Criar o gráfico Sankey
-    sankey = (
-        Sankey(init_opts=opts.InitOpts(width="100%", height="600px"))
-        .add(
-            series_name="Fluxo de Vendas",
-            nodes=nodes,
-            links=links,
-            linestyle_opt=opts.LineStyleOpts(opacity=0.2, curve=0.5, color="source"),
-            label_opts=opts.LabelOpts(position="right"),
-            node_gap=10,
-        )
-        .set_global_opts(
-            title_opts=opts.TitleOpts(
-                
-                pos_top="5%",  # Ajuste da posição vertical do título
-                pos_left="center"  # Centralização horizontal
-            ),
-            tooltip_opts=opts.TooltipOpts(trigger="item", trigger_on="mousemove"),
-        )
-    )
-    
-    return sankey
-
 # Adicionar ao seu dashboard existente
 with tab1:
     st.subheader("Fluxo de Vendas por Agência, Fornecedor e Tipo")
     
     if len(df_filtrado) > 0:
-        sankey_chart = create_sankey_diagram(df_filtrado)
+        # pyecharts/streamlit_echarts só são carregados quando o fluxo é exibido
+        from streamlit_echarts import st_pyecharts
+        from redetur.sankey import create_sankey_diagram
+        ag_forn = df_filtrado.groupby(["Agencias", "Fornecedor"], observed=True)["Vendas"].sum().reset_index()
+        forn_tipo = df_filtrado.groupby(["Fornecedor", "Tipo"], observed=True)["Vendas"].sum().reset_index()
+        sankey_chart = create_sankey_diagram(ag_forn, forn_tipo, top_k=25)
         st_pyecharts(sankey_chart)
     else:
         st.warning("Não há dados suficientes para exibir o gráfico Sankey com os filtros atuais.")
@@ -361,14 +292,9 @@ with tab1:
     st.subheader("Vendas Mensais (Histórico)")
     
     # Preparar dados históricos com base nos filtros principais
-    df_historico = df_filtrado.groupby(["Ano", "Mês"])["Vendas"].sum().reset_index()
+    df_historico = df_filtrado.groupby(["Ano", "Mês"], observed=True)["Vendas"].sum().reset_index()
     
-    # Ordenar meses cronologicamente
-    df_historico['Mês'] = pd.Categorical(
-        df_historico['Mês'],
-        categories=ORDEM_MESES,
-        ordered=True
-    )
+    # Ordenar meses cronologicamente (Mês já é categórico ordenado)
     df_historico = df_historico.sort_values(['Ano', 'Mês'])
 
     # Criar gráfico
@@ -410,7 +336,7 @@ with tab1:
     with col1:
         if agencia_sel == "Todas":
             fig = px.pie(
-                df_filtrado.groupby("Agencias")["Vendas"].sum().reset_index(),
+                df_filtrado.groupby("Agencias", observed=True)["Vendas"].sum().reset_index(),
                 names="Agencias",
                 values="Vendas",
                 title="Por Agência",
@@ -423,7 +349,7 @@ with tab1:
     with col2:
         if fornecedor_sel == "Todos":
             fig = px.pie(
-                df_filtrado.groupby("Fornecedor")["Vendas"].sum().reset_index(),
+                df_filtrado.groupby("Fornecedor", observed=True)["Vendas"].sum().reset_index(),
                 names="Fornecedor",
                 values="Vendas",
                 title="Por Fornecedor",
@@ -439,18 +365,23 @@ with tab2:
         df_filtrado.reset_index(drop=True),
         column_config={
             "Vendas": st.column_config.NumberColumn(format="R$ %.2f"),
-            "Receita": st.column_config.NumberColumn(format="R$ %.2f")
+            "Receita": st.column_config.NumberColumn(format="R$ %.2f"),
+            "period": None
         },
         hide_index=True,
         use_container_width=True,
         height=600
     )
     
-    # Botão para exportar dados
+    # Botão para exportar dados: o arquivo só é gerado no clique
+    formato = st.selectbox("Formato", available_formats(), key="formato_exportacao")
+    chave_exportacao = (DATA_VERSION, tuple(selecao.items()), formato)
+    export_cache = get_export_cache()
     st.download_button(
         label="📥 Exportar dados filtrados",
-        data=df_filtrado.to_csv(index=False).encode('utf-8'),
-        file_name=f"dados_redetur_filtrados.csv",
-        mime="text/csv",
-        key="download_button"
+        data=lambda: export_cache.get_or_compute(chave_exportacao, lambda: export_bytes(df_filtrado, formato)),
+        file_name=export_filename("dados_redetur_filtrados", formato),
+        mime=export_mime(formato),
+        key="download_button",
+        on_click="ignore"
     )
\ No newline at end of file
@@ -0,0 +1 @@
+# Medições de desempenho dos dashboards Redetur (fora do app)
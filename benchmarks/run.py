@@ -0,0 +1,115 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.scenarios import Context, build_scenarios, check_filters, default_selection, timed
+from benchmarks.synthetic import generate_sales
+
+# ================================================
+# SUÍTE DE BENCHMARKS (10 MIL A 10 MILHÕES DE LINHAS)
+# ================================================
+#
+#   python -m benchmarks.run --tamanhos 10k 100k 1M 10M -o resultados.json
+
+TAMANHOS_PADRAO = ["10k", "100k", "1M", "10M"]
+
+
+def parse_size(texto):
+    # "10k" -> 10_000, "1M" -> 1_000_000, "2500" -> 2500
+    texto = texto.strip()
+    multiplicador = {"k": 1_000, "m": 1_000_000}.get(texto[-1].lower(), 1)
+    numero = texto[:-1] if multiplicador > 1 else texto
+    return int(float(numero) * multiplicador)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(n_rows, repeat=3, seed=0, pdf_max_linhas=100_000, pular=(), log=print, xlsx_max_linhas=20_000):
+    """Executa todos os cenários para uma base sintética de `n_rows` linhas."""
+    inicio = time.perf_counter()
+    ctx = Context(generate_sales(n_rows, seed=seed))
+    resultado = {
+        "linhas": n_rows,
+        "geracao_s": round(time.perf_counter() - inicio, 4),
+        "cenarios": {},
+    }
+
+    for nome, preparar, atributo in build_scenarios(pdf_max_linhas, xlsx_max_linhas):
+        if nome in pular:
+            continue
+        fn = preparar(ctx)
+        # Cenários que preparam o contexto rodam uma vez só além das repetições
+        tempos, saida = timed(fn, repeat)
+        if atributo is not None:
+            setattr(ctx, atributo, saida)
+            if atributo == "index":
+                ctx.selection = default_selection(ctx.df)
+        resultado["cenarios"][nome] = {
+            "mediana_s": round(float(np.median(tempos)), 6),
+            "min_s": round(min(tempos), 6),
+            "max_s": round(max(tempos), 6),
+        }
+        log(f"  {nome:<36} {np.median(tempos) * 1000:>10.1f} ms")
+
+    if ctx.index is not None and ctx.cube is not None:
+        resultado["filtros_consistentes"] = bool(check_filters(ctx))
+    if ctx.cube is not None:
+        resultado["celulas_cubo"] = len(ctx.cube.cells)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do app18 com dados sintéticos no formato da planilha Redetur.")
+    parser.add_argument("--tamanhos", nargs="+", default=TAMANHOS_PADRAO, help="Ex.: 10k 100k 1M 10M")
+    parser.add_argument("-r", "--repeticoes", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pdf-max-linhas", type=int, default=100_000,
+                        help="Limite de linhas da tabela no cenário de PDF")
+    parser.add_argument("--xlsx-max-linhas", type=int, default=20_000,
+                        help="Linhas gravadas na planilha dos cenários de leitura .xlsx")
+    parser.add_argument("--pular", nargs="*", default=[], help="Cenários a ignorar (ex.: pdf_agencia)")
+    parser.add_argument("-o", "--saida", help="Grava os resultados em JSON neste arquivo")
+    args = parser.parse_args(argv)
+
+    resultados = {
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "repeticoes": args.repeticoes,
+        "seed": args.seed,
+        "tamanhos": [],
+    }
+    for tamanho in args.tamanhos:
+        n_rows = parse_size(tamanho)
+        print(f"{tamanho} ({n_rows:,} linhas)")
+        resultados["tamanhos"].append(
+            run_size(n_rows, args.repeticoes, args.seed, args.pdf_max_linhas, set(args.pular),
+                     xlsx_max_linhas=args.xlsx_max_linhas)
+        )
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"Resultados em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# ================================================
+# TEMPO DE INICIALIZAÇÃO (COLD START) DOS DASHBOARDS
+# ================================================
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = ["app.py", "app18.py", "app9.py", "app1.py", "orinter.py"]
+
+# Bibliotecas pesadas cuja carga queremos adiar até a página precisar
+MODULOS_PESADOS = ["plotly", "pyecharts", "streamlit_echarts", "fpdf", "PIL", "openpyxl"]
+
+# Executado em um interpretador novo para cada medição (nada em sys.modules)
+_MEDICAO = """
+import json, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_s = time.perf_counter() - inicio
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+inicio = time.perf_counter()
+at.run()
+primeira_execucao_s = time.perf_counter() - inicio
+print(json.dumps({
+    "import_streamlit_s": streamlit_s,
+    "primeira_execucao_s": primeira_execucao_s,
+    "excecoes": [e.value for e in at.exception],
+    "modulos_carregados": [m for m in sys.argv[2:] if m in sys.modules],
+}))
+"""
+
+
+def measure_script(script, repeticoes=3):
+    """Mede a primeira execução do script em `repeticoes` processos novos.
+
+    "primeira_execucao_s" é o tempo do primeiro rerun completo (imports do
+    script, leitura dos dados e montagem da página): a melhor aproximação
+    do primeiro paint sem um navegador.
+    """
+    caminho = os.path.join(RAIZ, script)
+    amostras = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", _MEDICAO, caminho] + MODULOS_PESADOS,
+            cwd=RAIZ, capture_output=True, text=True, check=True,
+            env=dict(os.environ, PYTHONPATH=RAIZ),
+        )
+        amostras.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    tempos = sorted(a["primeira_execucao_s"] for a in amostras)
+    return {
+        "script": script,
+        "primeira_execucao_mediana_s": round(tempos[len(tempos) // 2], 3),
+        "primeira_execucao_min_s": round(tempos[0], 3),
+        "import_streamlit_s": round(min(a["import_streamlit_s"] for a in amostras), 3),
+        "modulos_carregados": amostras[-1]["modulos_carregados"],
+        "excecoes": amostras[-1]["excecoes"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o cold start e a primeira execução dos dashboards.")
+    parser.add_argument("scripts", nargs="*", default=SCRIPTS)
+    parser.add_argument("-n", "--repeticoes", type=int, default=3)
+    parser.add_argument("-o", "--saida", help="Grava os resultados em JSON neste arquivo")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for script in args.scripts:
+        if not os.path.exists(os.path.join(RAIZ, script)):
+            print(f"{script}: não encontrado", file=sys.stderr)
+            continue
+        r = measure_script(script, args.repeticoes)
+        resultados.append(r)
+        print(f"{script:<14} {r['primeira_execucao_mediana_s']:>7.3f}s  carregados: {', '.join(r['modulos_carregados']) or '-'}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
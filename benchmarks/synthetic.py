@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from redetur.schema import ORDEM_MESES
+
+# ================================================
+# DADOS SINTÉTICOS NO FORMATO DA PLANILHA REDETUR
+# ================================================
+
+# Proporções observadas em Power_BI_Fornecedores _Agencias_2023_25.xlsx
+FRACAO_VENDAS_VAZIAS = 0.88        # a maioria das linhas não tem venda no mês
+LOG_VENDAS = (9.5, 2.0)            # log(Vendas) ~ Normal(média, desvio)
+PESOS_ANOS = {2023: 0.39, 2024: 0.52, 2025: 0.09}
+TIPOS = {"Consolidadora": 0.45, "Operadora": 0.45, "Seguradora": 0.10}
+
+
+def _zipf_weights(n, s, rng):
+    # Poucas entidades concentram a maior parte das linhas (cauda longa)
+    pesos = 1.0 / np.arange(1, n + 1) ** s
+    rng.shuffle(pesos)
+    return pesos / pesos.sum()
+
+
+def generate_sales(n_rows, n_agencias=104, n_fornecedores=16, seed=0):
+    """Gera `n_rows` linhas com as colunas e os tipos lidos da planilha.
+
+    Mesmo formato de read_excel: Fornecedor, Tipo, Agencias e Mês como
+    texto, Ano float, Vendas com ~88% de vazios e log-normal no resto,
+    Receita como fração das vendas e '%' vazio. Agências e fornecedores
+    seguem distribuições assimétricas; cada fornecedor tem um só Tipo.
+    """
+    rng = np.random.default_rng(seed)
+
+    agencias = np.array([f"Agência {i:03d}" for i in range(1, n_agencias + 1)], dtype=object)
+    fornecedores = np.array([f"Fornecedor {i:02d}" for i in range(1, n_fornecedores + 1)], dtype=object)
+    tipo_do_fornecedor = rng.choice(np.array(list(TIPOS), dtype=object), size=n_fornecedores, p=list(TIPOS.values()))
+
+    ag = rng.choice(n_agencias, size=n_rows, p=_zipf_weights(n_agencias, 0.8, rng))
+    forn = rng.choice(n_fornecedores, size=n_rows, p=_zipf_weights(n_fornecedores, 0.5, rng))
+    anos = rng.choice(np.array(list(PESOS_ANOS), dtype="float64"), size=n_rows, p=list(PESOS_ANOS.values()))
+    meses = rng.integers(0, 12, size=n_rows)
+
+    # Agências maiores vendem mais por linha, não só têm mais linhas
+    escala_agencia = rng.lognormal(0.0, 0.6, size=n_agencias)
+    vendas = rng.lognormal(*LOG_VENDAS, size=n_rows) * escala_agencia[ag]
+    vendas[rng.random(n_rows) < FRACAO_VENDAS_VAZIAS] = np.nan
+    receita = np.nan_to_num(vendas) * rng.uniform(0.05, 0.15, size=n_rows)
+
+    return pd.DataFrame({
+        "Fornecedor": fornecedores[forn],
+        "Tipo": tipo_do_fornecedor[forn],
+        "Agencias": agencias[ag],
+        "Mês": np.array(ORDEM_MESES, dtype=object)[meses],
+        "Ano": anos,
+        "Vendas": vendas.round(2),
+        "%": np.full(n_rows, np.nan),
+        "Receita": receita.round(2),
+    })
@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from PIL import Image
 import io
 import base64  # Added this import for base64 conversion
 
@@ -23,17 +22,27 @@ COLOR_PALETTE = {
     "warning": "#f39c12"
 }
 
-# Função auxiliar para converter imagem para base64 - MOVED TO TOP
-def logo_to_base64(image):
+# Logo em PNG/base64, gerado uma vez (o PIL só é importado aqui)
+@st.cache_data
+def load_logo_base64():
+    from PIL import Image, ImageDraw, ImageFont
+    try:
+        logo = Image.open("logo original redetur.jpg")
+    except:
+        # Criar placeholder profissional
+        logo = Image.new('RGB', (200, 60), color=COLOR_PALETTE["primary"])
+        draw = ImageDraw.Draw(logo)
+        try:
+            font = ImageFont.truetype("arial.ttf", 24)
+        except:
+            font = ImageFont.load_default(24)
+        draw.text((10, 15), "REDETUR", font=font, fill='white')
     buffered = io.BytesIO()
-    image.save(buffered, format="PNG")
+    logo.save(buffered, format="PNG")
     return base64.b64encode(buffered.getvalue()).decode()
 
 @st.cache_data
 def load_data():
-    # Carregar todas as abas do Excel
-    dfs = pd.read_excel("orinnter.xlsx", sheet_name=None)
-    
     # Criando dados de exemplo baseados na estrutura do Excel
     agencias = [
         "Travel Mix Sta Maria", "Free Viagens", "Sierra Tur", "Tri Viagens",
@@ -76,25 +85,11 @@ def load_data():
 # Carregar dados
 df_vendas, df_mensal = load_data()
 
-# Logo da Redetur
-try:
-    logo = Image.open("logo original redetur.jpg")
-except:
-    # Criar placeholder profissional
-    logo = Image.new('RGB', (200, 60), color=COLOR_PALETTE["primary"])
-    from PIL import ImageDraw, ImageFont
-    draw = ImageDraw.Draw(logo)
-    try:
-        font = ImageFont.truetype("arial.ttf", 24)
-    except:
-        font = ImageFont.load_default(24)
-    draw.text((10, 15), "REDETUR", font=font, fill='white')
-
 # Cabeçalho
 st.markdown(f"""
     <div style="background-color:{COLOR_PALETTE['primary']};padding:20px;border-radius:10px;margin-bottom:30px">
         <div style="display:flex;align-items:center;justify-content:space-between">
-            <img src="data:image/png;base64,{logo_to_base64(logo)}" width="200">
+            <img src="data:image/png;base64,{load_logo_base64()}" width="200">
             <h1 style="color:white;text-align:center;margin:0">DASHBOARD DE VENDAS</h1>
             <div style="background-color:{COLOR_PALETTE['accent']};padding:10px 20px;border-radius:5px">
                 <h3 style="color:white;margin:0">TOTAL</h3>
@@ -106,12 +101,6 @@ st.markdown(f"""
 
 # Rest of your code remains the same...s
 
-# Função auxiliar para converter imagem para base64
-def logo_to_base64(image):
-    buffered = io.BytesIO()
-    image.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode()
-
 # Seção de filtros
 st.markdown(f"""
     <div style="background-color:{COLOR_PALETTE['background']};padding:20px;border-radius:10px;margin-bottom:30px">
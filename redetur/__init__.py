@@ -0,0 +1 @@
+# Módulos compartilhados pelos dashboards Redetur (app9, app18, app1...)
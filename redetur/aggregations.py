@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from redetur.cube import rollup
+
+# ================================================
+# PLANEJADOR DE AGREGAÇÕES (UMA PASSADA POR PÁGINA)
+# ================================================
+
+
+def plan_aggregations(df, specs, measures=("Vendas", "Receita")):
+    """Calcula vários agregados de uma página a partir de um único groupby.
+
+    specs: {nome: [dimensões]}; uma lista vazia gera os totais gerais.
+    O DataFrame é agrupado uma vez pela união de todas as dimensões pedidas
+    e cada agregado é reagregado a partir desse resultado intermediário,
+    que tem no máximo uma linha por combinação de valores.
+    """
+    measures = list(measures)
+    dims = []
+    for by in specs.values():
+        for dim in by:
+            if dim not in dims:
+                dims.append(dim)
+
+    if dims:
+        base = df.groupby(dims, observed=True, sort=True)[measures].sum().reset_index()
+    else:
+        base = df[measures]
+
+    return {nome: rollup(base, by, measures) for nome, by in specs.items()}
+
+
+def top_n_with_others(labels, values, n, outros="Outros"):
+    """Mantém os `n` rótulos de maior valor total e troca os demais por `outros`.
+
+    Devolve uma Series de strings alinhada a `labels`; com n=None nada muda.
+    """
+    labels = pd.Series(labels).astype(str).reset_index(drop=True)
+    if n is None:
+        return labels
+    totais = pd.Series(np.asarray(values, dtype="float64")).fillna(0).groupby(labels.to_numpy()).sum()
+    if len(totais) <= n:
+        return labels
+    manter = totais.nlargest(n).index
+    return labels.where(labels.isin(manter), outros)
@@ -0,0 +1,136 @@
+import argparse
+import hashlib
+import multiprocessing
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from redetur.reports import cached_report
+
+# ================================================
+# GERAÇÃO EM LOTE DOS RELATÓRIOS PDF (ZIP)
+# ================================================
+
+# Tipo de relatório -> (coluna de agrupamento, pasta no ZIP); a função
+# geradora de cada tipo fica em reports.REPORT_GENERATORS
+REPORT_KINDS = {
+    "agencia": ("Agencias", "agencias"),
+    "fornecedor": ("Fornecedor", "fornecedores"),
+}
+
+
+def report_filename(kind, name, usados=None):
+    """Caminho do PDF dentro do ZIP.
+
+    Nomes diferentes podem virar o mesmo slug ('Viva' e 'Viva +'); com
+    `usados` (set dos caminhos já gravados) a colisão ganha como sufixo um
+    hash curto do nome original e o caminho escolhido entra no set.
+    """
+    pasta = REPORT_KINDS[kind][1]
+    slug = re.sub(r"[^\w\-]+", "_", str(name), flags=re.UNICODE).strip("_") or "sem_nome"
+    caminho = f"{pasta}/relatorio_{slug}.pdf"
+    if usados is None:
+        return caminho
+    if caminho in usados:
+        sufixo = hashlib.sha1(str(name).encode("utf-8")).hexdigest()[:8]
+        caminho = f"{pasta}/relatorio_{slug}_{sufixo}.pdf"
+        contador = 2
+        while caminho in usados:
+            caminho = f"{pasta}/relatorio_{slug}_{sufixo}_{contador}.pdf"
+            contador += 1
+    usados.add(caminho)
+    return caminho
+
+
+def iter_report_tasks(df, kinds=tuple(REPORT_KINDS)):
+    # Uma tarefa por agência/fornecedor, já com a fatia de linhas correspondente
+    for kind in kinds:
+        coluna = REPORT_KINDS[kind][0]
+        for name, grupo in df.groupby(coluna, observed=True, sort=True):
+            yield kind, name, grupo
+
+
+def _render_report(kind, name, df_entity, selection=None, data_version=None):
+    # Executado nos processos do pool; PDFs já gerados saem do cache em disco
+    inicio = time.perf_counter()
+    pdf_bytes = cached_report(kind, name, df_entity, selection=selection, data_version=data_version)
+    return kind, name, pdf_bytes, time.perf_counter() - inicio
+
+
+def generate_reports_zip(df, destino, kinds=tuple(REPORT_KINDS), max_workers=None, progress=None,
+                         selection=None, data_version=None):
+    """Gera um PDF por agência/fornecedor em paralelo e grava tudo em um ZIP.
+
+    `destino` pode ser um caminho ou um arquivo aberto em modo binário
+    (ex.: BytesIO). Cada PDF é escrito no ZIP assim que fica pronto.
+    `progress(concluidos, total, nome)` é chamado a cada relatório.
+    `selection`/`data_version` compõem a chave do cache de relatórios; sem
+    `data_version` a chave é o hash das linhas de cada entidade.
+    Retorna um dict com total, erros e tempo total em segundos.
+    """
+    inicio = time.perf_counter()
+    tarefas = list(iter_report_tasks(df, kinds))
+    erros = []
+    # Caminhos definidos na ordem das tarefas: o sufixo de colisão não
+    # depende de qual PDF fica pronto primeiro
+    usados = set()
+    caminhos = [report_filename(kind, name, usados) for kind, name, _ in tarefas]
+
+    # spawn: os workers não herdam as threads do servidor do Streamlit
+    contexto = multiprocessing.get_context("spawn")
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as zf, \
+            ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto) as pool:
+        futuros = {pool.submit(_render_report, *tarefa, selection, data_version): (*tarefa[:2], caminho)
+                   for tarefa, caminho in zip(tarefas, caminhos)}
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            kind, name, caminho = futuros[futuro]
+            try:
+                _, _, pdf_bytes, _ = futuro.result()
+                zf.writestr(caminho, pdf_bytes)
+            except Exception as e:
+                erros.append((kind, name, str(e)))
+            if progress is not None:
+                progress(concluidos, len(tarefas), name)
+
+    return {"total": len(tarefas), "erros": erros, "segundos": time.perf_counter() - inicio}
+
+
+# ================================================
+# LINHA DE COMANDO
+# ================================================
+
+def main(argv=None):
+    from redetur.cache import read_excel_cached
+    from redetur.schema import COLUNAS_LEITURA, to_canonical
+
+    parser = argparse.ArgumentParser(description="Gera os relatórios PDF de todas as agências/fornecedores em um ZIP.")
+    parser.add_argument("planilha", nargs="?", default="Power_BI_Fornecedores _Agencias_2023_25.xlsx")
+    parser.add_argument("-o", "--saida", default="relatorios.zip")
+    parser.add_argument("--aba", default="Planilha1")
+    parser.add_argument("--tipos", nargs="+", choices=list(REPORT_KINDS), default=list(REPORT_KINDS))
+    parser.add_argument("--ano", type=int, help="Restringe os relatórios a um ano")
+    parser.add_argument("--mes", help="Restringe os relatórios a um mês (ex.: Março)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    df = to_canonical(read_excel_cached(args.planilha, sheet_name=args.aba, columns=COLUNAS_LEITURA, required=["Agencias"]))
+    if args.ano is not None:
+        df = df[df["Ano"] == args.ano]
+    if args.mes:
+        df = df[df["Mês"] == args.mes]
+
+    def progresso(concluidos, total, nome):
+        print(f"[{concluidos}/{total}] {nome}", file=sys.stderr)
+
+    resultado = generate_reports_zip(df, args.saida, kinds=args.tipos, max_workers=args.workers, progress=progresso)
+    for kind, name, erro in resultado["erros"]:
+        print(f"Erro em {kind} {name}: {erro}", file=sys.stderr)
+    print(f"{resultado['total'] - len(resultado['erros'])} relatórios em {args.saida} ({resultado['segundos']:.1f}s)")
+    return 1 if resultado["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ================================================
+# ARMAZENAMENTO DE ARQUIVOS GERADOS (PDFs, ZIPs) NO SERVIDOR
+# ================================================
+
+
+class BlobStore:
+    """Arquivos gerados por sessão, com cota por sessão, limite global e TTL.
+
+    Compartilhado entre as sessões do Streamlit (via st.cache_resource); o
+    st.session_state guarda só o nome do arquivo, nunca os bytes. Ao passar
+    da cota da sessão (ou do limite global) os arquivos mais antigos saem
+    primeiro; arquivos sem acesso há mais de `ttl_seconds` expiram.
+    """
+
+    def __init__(self, max_bytes_per_session=32 * 1024 * 1024, max_bytes=512 * 1024 * 1024,
+                 ttl_seconds=30 * 60):
+        self.max_bytes_per_session = max_bytes_per_session
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.nbytes = 0
+        # (sessão, nome) -> (dados, último acesso); ordem = menos recente primeiro
+        self._data = OrderedDict()
+        self._session_bytes = {}
+        self._lock = threading.Lock()
+
+    def put(self, session_id, name, data):
+        data = bytes(data)
+        if len(data) > self.max_bytes_per_session:
+            return False  # maior que a cota inteira da sessão: não guarda
+        with self._lock:
+            self._remove((session_id, name))
+            self._data[(session_id, name)] = (data, time.monotonic())
+            self.nbytes += len(data)
+            self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + len(data)
+            self._evict(session_id)
+        return True
+
+    def get(self, session_id, name):
+        chave = (session_id, name)
+        with self._lock:
+            self._expire()
+            if chave not in self._data:
+                return None
+            data, _ = self._data.pop(chave)
+            self._data[chave] = (data, time.monotonic())
+            return data
+
+    def __contains__(self, chave):
+        with self._lock:
+            self._expire()
+            return chave in self._data
+
+    def opener(self, session_id, name):
+        # Função sem argumentos para o st.download_button: os bytes só são
+        # lidos quando o usuário clica, e não reenviados a cada rerun
+        def abrir():
+            data = self.get(session_id, name)
+            return data if data is not None else b""
+        return abrir
+
+    def _remove(self, chave):
+        if chave in self._data:
+            data, _ = self._data.pop(chave)
+            self.nbytes -= len(data)
+            restante = self._session_bytes[chave[0]] - len(data)
+            if restante:
+                self._session_bytes[chave[0]] = restante
+            else:
+                del self._session_bytes[chave[0]]
+
+    def _expire(self):
+        limite = time.monotonic() - self.ttl_seconds
+        while self._data:
+            chave, (_, acesso) = next(iter(self._data.items()))
+            if acesso >= limite:
+                break
+            self._remove(chave)
+
+    def _evict(self, session_id):
+        self._expire()
+        if self._session_bytes.get(session_id, 0) > self.max_bytes_per_session:
+            for chave in [c for c in self._data if c[0] == session_id]:
+                self._remove(chave)
+                if self._session_bytes.get(session_id, 0) <= self.max_bytes_per_session:
+                    break
+        while self._data and self.nbytes > self.max_bytes:
+            self._remove(next(iter(self._data)))
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+
+from redetur.readers import read_sheet
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # sem pyarrow o cache fica desativado e lemos o Excel direto
+    pa = None
+    pq = None
+
+# ================================================
+# CACHE EM DISCO (PARQUET) DAS PLANILHAS
+# ================================================
+
+# Diretório padrão do cache, ao lado dos scripts
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "planilhas")
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_sha256(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _cache_paths(file_path, sheet_name, cache_dir):
+    # Um arquivo de cache por (planilha, aba), nomeado pelo caminho absoluto
+    chave = f"{os.path.abspath(file_path)}::{sheet_name}"
+    nome = hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(cache_dir, nome)
+    return base + ".parquet", base + ".json"
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, write_fn):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write_fn(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def workbook_fingerprint(file_path, sheet_name=0, cache_dir=CACHE_DIR):
+    """Retorna (size, mtime_ns, sha256) da planilha.
+
+    O hash do conteúdo só é recalculado quando tamanho ou mtime mudam;
+    caso contrário reaproveita o que está gravado nos metadados do cache.
+    """
+    stat = os.stat(file_path)
+    _, meta_path = _cache_paths(file_path, sheet_name, cache_dir)
+    meta = _read_meta(meta_path)
+    if meta and meta.get("size") == stat.st_size and meta.get("mtime_ns") == stat.st_mtime_ns:
+        return stat.st_size, stat.st_mtime_ns, meta["sha256"]
+    return stat.st_size, stat.st_mtime_ns, file_sha256(file_path)
+
+
+def workbook_version(file_path, sheet_name=0, cache_dir=CACHE_DIR):
+    # Versão curta dos dados, usada como chave de caches derivados
+    return workbook_fingerprint(file_path, sheet_name, cache_dir)[2][:12]
+
+
+def read_excel_cached(file_path, sheet_name=0, cache_dir=CACHE_DIR, **read_kwargs):
+    """Lê uma aba do Excel usando um cache Parquet persistente.
+
+    O cache é indexado pelo caminho, tamanho, mtime e hash do conteúdo da
+    planilha; só é reconstruído quando o arquivo muda. Com o cache válido a
+    leitura é feita em memória mapeada, sem passar pelo openpyxl.
+    `read_kwargs` vão para readers.read_sheet (columns, required, engine).
+    """
+    if pq is None:
+        return read_sheet(file_path, sheet_name=sheet_name, **read_kwargs)
+
+    parquet_path, meta_path = _cache_paths(file_path, sheet_name, cache_dir)
+    stat = os.stat(file_path)
+    meta = _read_meta(meta_path)
+
+    if meta and os.path.exists(parquet_path) and meta.get("read_kwargs") == repr(sorted(read_kwargs.items())):
+        mesmo_arquivo = meta.get("size") == stat.st_size and meta.get("mtime_ns") == stat.st_mtime_ns
+        if not mesmo_arquivo and meta.get("size") == stat.st_size:
+            # mtime mudou (cópia, checkout...) mas o conteúdo pode ser o mesmo
+            if file_sha256(file_path) == meta.get("sha256"):
+                meta["mtime_ns"] = stat.st_mtime_ns
+                _write_atomic(meta_path, lambda p: _dump_meta(p, meta))
+                mesmo_arquivo = True
+        if mesmo_arquivo:
+            try:
+                return pq.read_table(parquet_path, memory_map=True).to_pandas()
+            except (OSError, pa.ArrowException):
+                pass  # cache corrompido: reconstrói abaixo
+
+    df = read_sheet(file_path, sheet_name=sheet_name, **read_kwargs)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        _write_atomic(parquet_path, lambda p: pq.write_table(table, p))
+        meta = {
+            "path": os.path.abspath(file_path),
+            "sheet_name": sheet_name,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(file_path),
+            "read_kwargs": repr(sorted(read_kwargs.items())),
+        }
+        _write_atomic(meta_path, lambda p: _dump_meta(p, meta))
+    except (OSError, pa.ArrowException):
+        # Colunas com tipos mistos ou disco sem permissão: segue sem cache
+        pass
+
+    return df
+
+
+def _dump_meta(path, meta):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
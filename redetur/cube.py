@@ -0,0 +1,102 @@
+import pandas as pd
+
+from redetur.schema import MEDIDAS, concat_canonical
+
+# ================================================
+# CUBO OLAP: Agencias x Fornecedor x Tipo x Ano x Mês
+# ================================================
+
+CUBE_DIMS = ["Agencias", "Fornecedor", "Tipo", "Ano", "Mês"]
+CUBE_MEASURES = MEDIDAS + ["Registros"]
+
+
+def filter_cells(cells, selection):
+    # selection: {dimensão: valor} ou {dimensão: [valores]}; None/vazio = sem filtro
+    if not selection:
+        return cells
+    mask = None
+    for dim, value in selection.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set, frozenset)):
+            cond = cells[dim].isin(list(value))
+        else:
+            cond = cells[dim] == value
+        mask = cond if mask is None else mask & cond
+    if mask is None:
+        return cells
+    return cells[mask]
+
+
+def rollup(cells, by, measures=CUBE_MEASURES):
+    # Reagrega células já somadas para uma granularidade mais grossa
+    by = list(by)
+    measures = list(measures)
+    if not by:
+        return pd.DataFrame([cells[measures].sum()])
+    return cells.groupby(by, observed=True, sort=True)[measures].sum().reset_index()
+
+
+class SalesCube:
+    """Somas de Vendas/Receita e contagem de registros por combinação de
+    Agencias, Fornecedor, Tipo, Ano e Mês.
+
+    As células são calculadas uma vez por versão dos dados; filtros da
+    sidebar e agrupamentos das páginas passam a custar O(células) em vez
+    de O(linhas).
+    """
+
+    def __init__(self, cells, version=None):
+        self.cells = cells
+        self.version = version
+
+    @classmethod
+    def from_frame(cls, df, version=None):
+        keys = CUBE_DIMS + (["period"] if "period" in df.columns else [])
+        cells = (
+            df.groupby(keys, observed=True, dropna=False, sort=True)
+            .agg(Vendas=("Vendas", "sum"), Receita=("Receita", "sum"), Registros=("Vendas", "size"))
+            .reset_index()
+        )
+        return cls(cells, version=version)
+
+    def append(self, df_new, version=None):
+        """Cubo com as linhas novas somadas, sem reagrupar o histórico.
+
+        Só as células dos (Ano, Mês) presentes em `df_new` são reagregadas;
+        as demais são reaproveitadas como estão. Devolve um novo cubo: o
+        atual pode estar em uso por outras sessões.
+        """
+        novas = SalesCube.from_frame(df_new).cells
+        if novas.empty:
+            return SalesCube(self.cells, version=version)
+        keys = [c for c in self.cells.columns if c not in CUBE_MEASURES]
+        cells = concat_canonical([self.cells, novas])
+        periodos = pd.MultiIndex.from_frame(novas[["Ano", "Mês"]]).unique()
+        tocadas = pd.MultiIndex.from_frame(cells[["Ano", "Mês"]]).isin(periodos)
+        reagregadas = (
+            cells[tocadas]
+            .groupby(keys, observed=True, dropna=False, sort=False)[CUBE_MEASURES].sum()
+            .reset_index()
+        )
+        cells = (
+            pd.concat([cells[~tocadas], reagregadas], ignore_index=True)
+            .sort_values(keys, kind="stable")
+            .reset_index(drop=True)
+        )
+        return SalesCube(cells, version=version)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def filter(self, selection=None):
+        return filter_cells(self.cells, selection)
+
+    def query(self, selection=None, by=(), measures=CUBE_MEASURES):
+        return rollup(self.filter(selection), by, measures)
+
+    def totals(self, selection=None):
+        return self.filter(selection)[CUBE_MEASURES].sum()
+
+    def nunique(self, dim, selection=None):
+        return self.filter(selection)[dim].nunique()
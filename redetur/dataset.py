@@ -0,0 +1,335 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from redetur.cache import CACHE_DIR, _write_atomic, read_excel_cached, workbook_version
+from redetur.cube import filter_cells
+from redetur.ingest import HAS_PYARROW, MonthlyStore
+from redetur.schema import CANONICAL_COLUMNS, COLUNAS_LEITURA, concat_canonical, to_canonical
+from redetur.shared_dataset import DatasetService
+
+# ================================================
+# BASE ÚNICA DAS PLANILHAS POWER BI (PARTIÇÕES POR ANO)
+# ================================================
+#
+# As planilhas 2023_24 e 2023_25 se sobrepõem. MergedDataset lê as duas,
+# mantém uma linha de origem por chave (Agencias, Fornecedor, Tipo, Ano,
+# Mês) segundo a ordem de precedência e grava o resultado em Ano=AAAA.parquet,
+# numa pasta por versão apontada pelo arquivo ATUAL:
+#
+#   base = MergedDataset()
+#   df_2024 = base.read(anos=[2024])          # só lê Ano=2024.parquet
+#   df = base.query({"Ano": 2024, "Mês": "Março"})
+#
+# Quando as planilhas só ganham linhas no fim, update() une de novo apenas os
+# (Ano, Mês) tocados e regrava só os anos correspondentes; o DatasetService
+# de service() soma essas linhas aos dados e ao cubo da versão anterior.
+
+# Ordem de precedência: em chaves presentes nas duas, vale a primeira
+FONTES = [
+    ("Power_BI_Fornecedores _Agencias_2023_25.xlsx", "Planilha1"),
+    ("Power_BI_Fornecedores _Agencias_2023_24.xlsx", "Planilha1"),
+]
+DEDUP_KEYS = ["Agencias", "Fornecedor", "Tipo", "Ano", "Mês"]
+
+DATASET_DIR = os.path.join(os.path.dirname(CACHE_DIR), "base")
+MANIFEST = "manifest.json"
+ATUAL = "ATUAL"  # nome da pasta da versão em uso
+_SEM_ANO = "NA"
+
+
+def _keep_masks(frames, keys=DEDUP_KEYS):
+    # Linhas de cada fonte que entram na base unida (ver merge_sources)
+    mascaras, vistas = [], None
+    for df in frames:
+        chaves = pd.MultiIndex.from_frame(df[keys])
+        if vistas is None:
+            manter = np.ones(len(df), dtype=bool)
+            vistas = chaves.unique()
+        else:
+            manter = ~chaves.isin(vistas)
+            vistas = vistas.append(chaves[manter]).unique()
+        mascaras.append(manter)
+    return mascaras
+
+
+def merge_sources(frames, keys=DEDUP_KEYS):
+    """Une tabelas canônicas dadas em ordem de precedência.
+
+    Uma chave presente numa fonte anterior descarta todas as linhas da
+    mesma chave nas fontes seguintes; dentro de uma fonte nada é removido
+    (linhas repetidas da mesma planilha continuam somando como antes).
+    Devolve (tabela unida, linhas descartadas por fonte).
+    """
+    mascaras = _keep_masks(frames, keys)
+    partes = [df[manter] for df, manter in zip(frames, mascaras)]
+    descartadas = [int((~manter).sum()) for manter in mascaras]
+    return concat_canonical(partes).reset_index(drop=True), descartadas
+
+
+def _ano_key(ano):
+    return _SEM_ANO if pd.isna(ano) else str(int(ano))
+
+
+class MergedDataset:
+    """Base única das planilhas em FONTES, gravada em partições por Ano.
+
+    A versão é o hash das versões das planilhas; as partições só são
+    regravadas quando alguma delas muda. Cada planilha passa pela
+    MonthlyStore (só as linhas novas são interpretadas) quando há pyarrow.
+    O conteúdo de uma planilha só é lido para o hash quando tamanho ou
+    mtime mudam, como em cache.workbook_fingerprint.
+    """
+
+    def __init__(self, sources=FONTES, directory=None):
+        self.sources = list(sources)
+        if directory is None:
+            chave = "|".join(f"{os.path.abspath(p)}::{s}" for p, s in self.sources)
+            directory = os.path.join(DATASET_DIR, hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16])
+        self.directory = directory
+        self._stores = [MonthlyStore(p, s) for p, s in self.sources] if HAS_PYARROW else None
+        self._versoes = {}  # fonte -> (size, mtime_ns, versão)
+        self._lock = threading.Lock()
+
+    @property
+    def paths(self):
+        return [p for p, _ in self.sources]
+
+    def _source_version(self, i):
+        path, sheet = self.sources[i]
+        stat = os.stat(path)
+        chave = (stat.st_size, stat.st_mtime_ns)
+        guardada = self._versoes.get(i)
+        if guardada is not None and guardada[:2] == chave:
+            return guardada[2]
+        # O manifest da MonthlyStore já traz o hash da planilha no tamanho/mtime lidos
+        store = self._stores[i].manifest() if self._stores is not None else None
+        if store is not None and (store.get("size"), store.get("mtime_ns")) == chave:
+            versao = store["sha256"][:12]
+        else:
+            versao = workbook_version(path, sheet_name=sheet)
+        self._versoes[i] = (*chave, versao)
+        return versao
+
+    def version(self):
+        versoes = "|".join(self._source_version(i) for i in range(len(self.sources)))
+        return hashlib.sha1(versoes.encode("utf-8")).hexdigest()[:12]
+
+    # ---------- manifest e partições ----------
+
+    def manifest(self):
+        # Manifest da versão apontada por ATUAL; "pasta" indica onde estão as partições
+        try:
+            with open(os.path.join(self.directory, ATUAL), "r", encoding="utf-8") as f:
+                pasta = f.read().strip()
+            with open(os.path.join(self.directory, pasta, MANIFEST), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        manifest["pasta"] = pasta
+        return manifest
+
+    def partition_path(self, ano, manifest=None):
+        manifest = manifest or self.manifest()
+        chave = ano if ano == _SEM_ANO else _ano_key(ano)
+        return os.path.join(self.directory, manifest["pasta"], f"Ano={chave}.parquet")
+
+    def years(self):
+        manifest = self.refresh()
+        return [int(a) for a in manifest["anos"] if a != _SEM_ANO]
+
+    def _read_source(self, i):
+        if self._stores is not None:
+            store = self._stores[i]
+            resultado = store.refresh()
+            return resultado["novas"] if resultado["completa"] else store.read()
+        path, sheet = self.sources[i]
+        return to_canonical(read_excel_cached(path, sheet_name=sheet, columns=COLUNAS_LEITURA, required=["Agencias"]))
+
+    def _publish(self, manifest, partes):
+        """Grava uma versão nova da base e troca o ponteiro ATUAL para ela.
+
+        `partes` traz só os anos regravados; os demais anos do manifest são
+        reaproveitados da versão anterior. As partições vão para uma pasta
+        própria da versão; só depois de tudo gravado o arquivo ATUAL é
+        substituído (os.replace), então leitores veem a versão anterior
+        inteira ou a nova inteira. Se a gravação falhar, a pasta nova é
+        apagada e a versão anterior continua valendo.
+        """
+        anterior = self.manifest()
+        pasta = f"{manifest['versao']}.{os.getpid()}.{time.time_ns()}"
+        destino = os.path.join(self.directory, pasta)
+        try:
+            os.makedirs(destino)
+            for chave, parte in partes.items():
+                parte.reset_index(drop=True).to_parquet(os.path.join(destino, f"Ano={chave}.parquet"), index=False)
+            # Anos sem mudança vêm da versão anterior (hard link; cópia se não der)
+            for chave in manifest["anos"]:
+                if chave not in partes:
+                    origem = self.partition_path(chave, anterior)
+                    copia = os.path.join(destino, f"Ano={chave}.parquet")
+                    try:
+                        os.link(origem, copia)
+                    except OSError:
+                        shutil.copy2(origem, copia)
+            with open(os.path.join(destino, MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+            def apontar(path):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(pasta)
+            _write_atomic(os.path.join(self.directory, ATUAL), apontar)
+        except Exception:
+            shutil.rmtree(destino, ignore_errors=True)
+            raise
+        # Mantém a versão anterior para leituras em andamento e pastas da mesma
+        # versão gravadas por outro processo; as demais saem
+        manter = {ATUAL, pasta, anterior["pasta"] if anterior else None}
+        for nome in os.listdir(self.directory):
+            if nome not in manter and not nome.startswith(f"{manifest['versao']}.") and not nome.endswith(".tmp"):
+                caminho = os.path.join(self.directory, nome)
+                if os.path.isdir(caminho):
+                    shutil.rmtree(caminho, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(caminho)
+                    except OSError:
+                        pass
+        manifest["pasta"] = pasta
+        return manifest
+
+    def _fontes(self, linhas, descartadas):
+        # Contagens por planilha e o hash em que a loja de cada uma estava
+        shas = [st.manifest()["sha256"] for st in self._stores] if self._stores is not None else [None] * len(linhas)
+        return [
+            {"arquivo": p, "aba": s, "linhas": n, "descartadas": d, "sha256": sha}
+            for (p, s), n, d, sha in zip(self.sources, linhas, descartadas, shas)
+        ]
+
+    def update(self):
+        """Atualiza a base unida com o que mudou nas planilhas.
+
+        Mesmo contrato de MonthlyStore.refresh(): devolve {"novas",
+        "particoes", "completa", "manifest"}. Quando as lojas das planilhas
+        só ganharam linhas, apenas os (Ano, Mês) tocados são unidos de novo
+        e só os anos correspondentes são regravados; "novas" traz as linhas
+        que entraram na base, ou None se alguma linha antiga saiu (uma fonte
+        de maior precedência passou a ter a mesma chave). Sem manifest
+        compatível ou com alguma loja reconstruída, a base é refeita inteira.
+        """
+        with self._lock:
+            versao = self.version()
+            manifest = self.manifest()
+            # Partições gravadas com outra projeção de colunas também são refeitas
+            valido = manifest is not None and manifest.get("colunas") == COLUNAS_LEITURA
+            if valido and manifest.get("versao") == versao:
+                return {"novas": None, "particoes": [], "completa": False, "manifest": manifest}
+
+            if valido and self._stores is not None:
+                antes = [st.manifest() for st in self._stores]
+                # As lojas precisam estar no ponto em que a base foi gravada
+                em_dia = all(
+                    a is not None and a.get("sha256") == f.get("sha256") for a, f in zip(antes, manifest["fontes"])
+                )
+                if em_dia:
+                    resultados = [st.refresh() for st in self._stores]
+                    if not any(r["completa"] for r in resultados):
+                        return self._update_periods(versao, manifest, antes, resultados)
+
+            frames = [self._read_source(i) for i in range(len(self.sources))]
+            df, descartadas = merge_sources(frames)
+            partes = {_ano_key(ano): parte for ano, parte in df.groupby("Ano", dropna=False, sort=True)}
+            manifest = {
+                "versao": versao,
+                "colunas": COLUNAS_LEITURA,
+                "fontes": self._fontes([len(f) for f in frames], descartadas),
+                "anos": {chave: len(parte) for chave, parte in partes.items()},
+            }
+            manifest = self._publish(manifest, partes)
+            return {"novas": df, "particoes": sorted(partes), "completa": True, "manifest": manifest}
+
+    def _update_periods(self, versao, manifest, antes, resultados):
+        # Une de novo só os (Ano, Mês) que ganharam linhas em alguma loja
+        tocadas = sorted(set().union(*(r["particoes"] for r in resultados)))
+        frames, novas = [], []
+        for store, anterior in zip(self._stores, antes):
+            existentes = store.manifest()["particoes"]
+            partes = [pd.read_parquet(store.partition_path(p)) for p in tocadas if p in existentes]
+            # As linhas acrescentadas ficam no fim de cada partição da loja
+            flags = [np.arange(len(parte)) >= anterior["particoes"].get(p, 0)
+                     for p, parte in zip([p for p in tocadas if p in existentes], partes)]
+            frames.append(concat_canonical(partes) if partes else store.read(partitions=[]))
+            novas.append(np.concatenate(flags) if flags else np.zeros(0, dtype=bool))
+
+        mascaras = _keep_masks(frames)
+        mascaras_antes = _keep_masks([f[~n] for f, n in zip(frames, novas)])
+        # Só dá para somar ao que já existia se nenhuma linha antiga foi descartada
+        mantidas = sum(int((m & ~n).sum()) for m, n in zip(mascaras, novas))
+        aditivo = mantidas == sum(int(m.sum()) for m in mascaras_antes)
+        unidas = concat_canonical([f[m] for f, m in zip(frames, mascaras)])
+        acrescentadas = None
+        if aditivo:
+            acrescentadas = concat_canonical([f[m & n] for f, m, n in zip(frames, mascaras, novas)])
+            acrescentadas = acrescentadas.reset_index(drop=True)
+
+        periodos = pd.MultiIndex.from_frame(unidas[["Ano", "Mês"]]).unique()
+        partes = {}
+        for ano, parte in unidas.groupby("Ano", dropna=False, sort=True):
+            chave = _ano_key(ano)
+            if chave in manifest["anos"]:
+                antigo = pd.read_parquet(self.partition_path(chave, manifest))
+                fora = ~pd.MultiIndex.from_frame(antigo[["Ano", "Mês"]]).isin(periodos)
+                parte = concat_canonical([antigo[fora], parte])
+            partes[chave] = parte
+
+        descartadas = [
+            f["descartadas"] + int((~m).sum()) - int((~ma).sum())
+            for f, m, ma in zip(manifest["fontes"], mascaras, mascaras_antes)
+        ]
+        linhas = [f["linhas"] + int(n.sum()) for f, n in zip(manifest["fontes"], novas)]
+        anos = {**manifest["anos"], **{chave: len(parte) for chave, parte in partes.items()}}
+        novo = {
+            "versao": versao,
+            "colunas": COLUNAS_LEITURA,
+            "fontes": self._fontes(linhas, descartadas),
+            "anos": dict(sorted(anos.items())),
+        }
+        novo = self._publish(novo, partes)
+        return {"novas": acrescentadas, "particoes": tocadas, "completa": False, "manifest": novo}
+
+    def refresh(self):
+        """Regrava as partições se alguma planilha mudou; devolve o manifest."""
+        return self.update()["manifest"]
+
+    # ---------- leitura ----------
+
+    def read(self, anos=None):
+        """Base unida; com `anos`, lê só as partições desses anos."""
+        manifest = self.refresh()
+        chaves = list(manifest["anos"]) if anos is None else [_ano_key(a) for a in anos]
+        partes = [pd.read_parquet(self.partition_path(c, manifest)) for c in chaves if c in manifest["anos"]]
+        if not partes:
+            return pd.DataFrame(columns=CANONICAL_COLUMNS)
+        return concat_canonical(partes)
+
+    def query(self, selection=None):
+        # Seleção no formato da sidebar; o filtro de Ano escolhe as partições lidas
+        selection = dict(selection or {})
+        anos = selection.get("Ano")
+        if anos is not None and not isinstance(anos, (list, tuple, set, frozenset)):
+            anos = [anos]
+        df = self.read(anos=anos)
+        return filter_cells(df, selection).reset_index(drop=True)
+
+    def service(self, check_interval=2.0):
+        # DatasetService que confere as duas planilhas e carrega a base unida;
+        # quando elas só ganham linhas, soma as novas aos dados e ao cubo anteriores
+        ingest = self.update if self._stores is not None else None
+        return DatasetService(self.paths, loader=self.read, check_interval=check_interval,
+                              ingest=ingest, version=self.version)
@@ -0,0 +1,78 @@
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:  # sem pyarrow não há exportação em Parquet
+    HAS_PYARROW = False
+
+# ================================================
+# EXPORTAÇÃO DOS DADOS FILTRADOS (CSV.GZ, PARQUET, XLSX)
+# ================================================
+
+# Rótulo no seletor -> (extensão, MIME)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV compactado (.csv.gz)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel (.xlsx)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+# Colunas internas que não vão para os arquivos exportados
+COLUNAS_INTERNAS = ["period"]
+
+
+def available_formats():
+    return [nome for nome, (ext, _) in EXPORT_FORMATS.items() if ext != "parquet" or HAS_PYARROW]
+
+
+def export_filename(base, formato):
+    return f"{base}.{EXPORT_FORMATS[formato][0]}"
+
+
+def export_mime(formato):
+    return EXPORT_FORMATS[formato][1]
+
+
+def _to_xlsx(df, chunk_size=5000):
+    # openpyxl em modo write_only: as linhas vão direto para o arquivo,
+    # memória constante independentemente do número de linhas
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Dados")
+    ws.append([str(c) for c in df.columns])
+    for inicio in range(0, len(df), chunk_size):
+        bloco = df.iloc[inicio:inicio + chunk_size].astype(object)
+        valores = bloco.where(bloco.notna(), None).to_numpy()
+        for linha in valores:
+            ws.append([v.item() if isinstance(v, np.generic) else v for v in linha])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def export_bytes(df, formato):
+    """Serializa o DataFrame no formato escolhido (chave de EXPORT_FORMATS)."""
+    df = df.drop(columns=COLUNAS_INTERNAS, errors="ignore").reset_index(drop=True)
+    ext = EXPORT_FORMATS[formato][0]
+    if ext == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    if ext == "csv.gz":
+        buffer = io.BytesIO()
+        # mtime=0: mesmo conteúdo gera sempre os mesmos bytes
+        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6, mtime=0) as gz:
+            with io.TextIOWrapper(gz, encoding="utf-8", newline="") as texto:
+                df.to_csv(texto, index=False)
+        return buffer.getvalue()
+    if ext == "parquet":
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False, compression="zstd")
+        return buffer.getvalue()
+    if ext == "xlsx":
+        return _to_xlsx(df)
+    raise ValueError(f"Formato de exportação desconhecido: {formato}")
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+# ================================================
+# ÍNDICE DE FILTROS (LISTAS ORDENADAS DE LINHAS POR VALOR)
+# ================================================
+
+FILTER_DIMS = ["Agencias", "Ano", "Mês", "Fornecedor", "Tipo"]
+
+_EMPTY = np.empty(0, dtype=np.intp)
+
+
+class FilterIndex:
+    """Índice invertido por dimensão: para cada valor, os números das
+    linhas que o contêm, em ordem crescente.
+
+    Aplicar os filtros da sidebar vira uma interseção das listas
+    selecionadas (começando pela menor) seguida de um único `take`,
+    em vez de uma cópia do DataFrame por filtro.
+    """
+
+    def __init__(self, df, dims=FILTER_DIMS):
+        self.df = df
+        self._index = {}
+        for dim in dims:
+            codes, uniques = pd.factorize(df[dim], sort=False)
+            # argsort estável mantém as linhas de cada valor em ordem crescente
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            lookup = {value: code for code, value in enumerate(uniques)}
+            self._index[dim] = (order, bounds, lookup)
+
+    def __len__(self):
+        return len(self.df)
+
+    def rows(self, dim, value):
+        order, bounds, lookup = self._index[dim]
+        if isinstance(value, (list, tuple, set, frozenset)):
+            partes = [self.rows(dim, v) for v in value]
+            if not partes:
+                return _EMPTY
+            return np.sort(np.concatenate(partes))
+        code = lookup.get(value)
+        if code is None:
+            return _EMPTY
+        return order[bounds[code]:bounds[code + 1]]
+
+    def select_rows(self, selection):
+        # None significa "todas as linhas" (nenhum filtro ativo)
+        listas = [self.rows(dim, value) for dim, value in (selection or {}).items() if value is not None]
+        if not listas:
+            return None
+        listas.sort(key=len)
+        rows = listas[0]
+        for outra in listas[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, outra, assume_unique=True)
+        return rows
+
+    def apply(self, selection):
+        # Sem filtros devolve o próprio DataFrame (somente leitura por convenção)
+        rows = self.select_rows(selection)
+        if rows is None:
+            return self.df
+        return self.df.take(rows)
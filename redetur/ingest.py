@@ -0,0 +1,276 @@
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+import zipfile
+
+import pandas as pd
+
+from redetur.cache import CACHE_DIR, _write_atomic, workbook_fingerprint
+from redetur.schema import COLUNAS_LEITURA, ORDEM_MESES, concat_canonical, to_canonical
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:  # sem pyarrow não há loja particionada; use read_excel_cached
+    HAS_PYARROW = False
+
+# ================================================
+# INGESTÃO INCREMENTAL POR MÊS (PARTIÇÕES Ano=AAAA/Mes=MM)
+# ================================================
+#
+# A planilha Power BI recebe linhas novas no fim a cada mês. Em vez de
+# reler o histórico inteiro, a loja guarda até que linha da aba já foi
+# lida e, quando o arquivo muda, interpreta só as linhas seguintes:
+#
+#   store = MonthlyStore("Power_BI_Fornecedores _Agencias_2023_25.xlsx", "Planilha1")
+#   resultado = store.refresh()   # {"novas": DataFrame, "particoes": [...], "completa": False, ...}
+#   df = store.read()             # histórico completo, já no esquema canônico
+
+STORE_DIR = os.path.join(os.path.dirname(CACHE_DIR), "vendas")
+MANIFEST = "manifest.json"
+STORE_VERSION = 2
+
+_CHUNK = 1024 * 1024
+_SEM_VALOR = "NA"
+
+
+def _row_signature(values):
+    # Identifica o conteúdo de uma linha da aba (confere que o histórico não mudou)
+    values = list(values)
+    while values and values[-1] is None:
+        values.pop()
+    bruto = json.dumps(values, default=str, ensure_ascii=False)
+    return hashlib.sha1(bruto.encode("utf-8")).hexdigest()
+
+
+def _partition_key(ano, mes):
+    ano = _SEM_VALOR if pd.isna(ano) else f"{int(ano):04d}"
+    mes = _SEM_VALOR if pd.isna(mes) else f"{ORDEM_MESES.index(mes) + 1:02d}"
+    return f"{ano}/{mes}"
+
+
+def _sheet_xml_from_row(zip_file, member, row):
+    """Cabeçalho do XML da aba + linhas a partir de `row`.
+
+    O XML é descompactado em blocos (rápido) e descartado até a marca
+    <row r="N">; só o trecho final, do tamanho das linhas novas, fica em
+    memória e passa pelo parser. Devolve None se a linha não existe.
+    """
+    padrao = re.compile(rb'<row\b[^>]*?\sr="%d"' % row)
+    with zip_file.open(member) as f:
+        buffer = b""
+        prefixo = None
+        while True:
+            bloco = f.read(_CHUNK)
+            buffer += bloco
+            if prefixo is None:
+                fim = buffer.find(b"<sheetData>")
+                if fim < 0:
+                    if not bloco:
+                        return None
+                    continue
+                prefixo = buffer[:fim + len(b"<sheetData>")]
+                buffer = buffer[len(prefixo):]
+            achado = padrao.search(buffer)
+            if achado:
+                return prefixo + buffer[achado.start():] + f.read()
+            if not bloco:
+                return None
+            buffer = buffer[-512:]  # a marca pode estar dividida entre dois blocos
+
+
+def iter_sheet_rows(file_path, sheet_name=0, start_row=1):
+    """Valores das linhas da aba a partir de `start_row` (1 = cabeçalho).
+
+    Gera (número da linha, tupla de valores). Usa o parser do openpyxl só
+    sobre o trecho pedido; se a estrutura interna do openpyxl não for a
+    esperada, cai para iter_rows(min_row=...), que interpreta a aba toda.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        try:
+            from openpyxl.worksheet._reader import WorkSheetParser
+
+            with zipfile.ZipFile(file_path) as z:
+                xml = _sheet_xml_from_row(z, ws._worksheet_path, start_row)
+            if xml is None:
+                return
+            parser = WorkSheetParser(
+                io.BytesIO(xml), ws._shared_strings, data_only=True, epoch=wb.epoch,
+                date_formats=wb._date_formats, timedelta_formats=wb._timedelta_formats
+            )
+            linhas = parser.parse()
+        except (ImportError, AttributeError, KeyError):
+            linhas = None
+
+        if linhas is None:
+            for numero, valores in enumerate(ws.iter_rows(min_row=start_row, values_only=True), start=start_row):
+                yield numero, tuple(valores)
+            return
+
+        for numero, celulas in linhas:
+            if not celulas:
+                yield numero, ()
+                continue
+            valores = [None] * celulas[-1]["column"]
+            for celula in celulas:
+                valores[celula["column"] - 1] = celula["value"]
+            yield numero, tuple(valores)
+    finally:
+        wb.close()
+
+
+class MonthlyStore:
+    """Loja Parquet de uma aba, particionada por Ano e Mês.
+
+    Partições ficam em `<diretório>/Ano=AAAA/Mes=MM.parquet` já no esquema
+    canônico; o manifest guarda colunas, última linha lida da aba e a
+    assinatura dessa linha. refresh() lê só as linhas depois dela (as
+    planilhas mensais só crescem no fim, muitas vezes preenchendo linhas
+    vazias já formatadas); se a linha guardada sumiu ou mudou, a loja é
+    reconstruída do zero.
+    """
+
+    def __init__(self, file_path, sheet_name=0, directory=None):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        if directory is None:
+            chave = f"{os.path.abspath(file_path)}::{sheet_name}"
+            directory = os.path.join(STORE_DIR, hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16])
+        self.directory = directory
+
+    # ---------- manifest ----------
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, MANIFEST)
+
+    def manifest(self):
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("versao") == STORE_VERSION else None
+
+    def _save_manifest(self, manifest):
+        def gravar(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+        _write_atomic(self._manifest_path(), gravar)
+
+    # ---------- partições ----------
+
+    def partition_path(self, chave):
+        ano, mes = chave.split("/")
+        return os.path.join(self.directory, f"Ano={ano}", f"Mes={mes}.parquet")
+
+    def partitions(self):
+        manifest = self.manifest()
+        return sorted(manifest["particoes"]) if manifest else []
+
+    def _write_partitions(self, df, manifest):
+        # Acrescenta as linhas canônicas de `df` às partições (Ano, Mês) correspondentes
+        tocadas = []
+        for (ano, mes), parte in df.groupby(["Ano", "Mês"], observed=True, dropna=False, sort=True):
+            chave = _partition_key(ano, mes)
+            path = self.partition_path(chave)
+            if chave in manifest["particoes"] and os.path.exists(path):
+                # Linhas atrasadas de um mês já gravado: reescreve só esse mês
+                parte = concat_canonical([pd.read_parquet(path), parte])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            parte = parte.reset_index(drop=True)
+            _write_atomic(path, lambda p, parte=parte: parte.to_parquet(p, index=False))
+            manifest["particoes"][chave] = len(parte)
+            tocadas.append(chave)
+        return tocadas
+
+    def read(self, partitions=None):
+        """Histórico canônico a partir das partições (todas, ou só as pedidas)."""
+        manifest = self.manifest()
+        if manifest is None:
+            return None
+        chaves = sorted(manifest["particoes"]) if partitions is None else partitions
+        partes = [pd.read_parquet(self.partition_path(c)) for c in chaves]
+        if not partes:
+            return self._frame(manifest["colunas"], [])
+        return concat_canonical(partes)
+
+    # ---------- ingestão ----------
+
+    def _frame(self, colunas, linhas):
+        # Só as colunas de COLUNAS_LEITURA e as linhas com agência viram registros
+        indices = [i for i, c in enumerate(colunas) if c in COLUNAS_LEITURA]
+        agencia = colunas.index("Agencias") if "Agencias" in colunas else None
+        registros = [
+            tuple(v[i] if i < len(v) else None for i in indices)
+            for v in linhas
+            if agencia is None or (agencia < len(v) and v[agencia] is not None)
+        ]
+        df = pd.DataFrame.from_records(registros, columns=[colunas[i] for i in indices])
+        # Como no read_excel, colunas sem nenhum valor ficam float
+        vazias = [c for c in df.columns if df[c].isna().all()]
+        df[vazias] = df[vazias].astype("float64")
+        return to_canonical(df)
+
+    def rebuild(self):
+        """Relê a aba inteira e recria todas as partições."""
+        inicio = time.perf_counter()
+        tamanho, mtime_ns, sha256 = workbook_fingerprint(self.file_path, self.sheet_name)
+        linhas = iter_sheet_rows(self.file_path, self.sheet_name, start_row=1)
+        _, cabecalho = next(linhas, (1, ()))
+        colunas = [str(c) for c in cabecalho if c is not None]
+        dados, ultima, assinatura = [], 1, _row_signature(cabecalho)
+        for numero, valores in linhas:
+            # Linhas vazias (formatadas para receber os próximos meses) não contam
+            if any(v is not None for v in valores):
+                dados.append(valores)
+                ultima, assinatura = numero, _row_signature(valores)
+
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = {"versao": STORE_VERSION, "colunas": colunas, "particoes": {}}
+        df = self._frame(colunas, dados)
+        tocadas = self._write_partitions(df, manifest)
+        manifest.update(ultima_linha=ultima, assinatura=assinatura, size=tamanho, mtime_ns=mtime_ns, sha256=sha256)
+        self._save_manifest(manifest)
+        return {"novas": df, "particoes": tocadas, "completa": True, "segundos": time.perf_counter() - inicio}
+
+    def refresh(self):
+        """Ingere as linhas acrescentadas desde a última leitura.
+
+        Devolve {"novas": linhas canônicas novas, "particoes": partições
+        tocadas, "completa": se a loja foi reconstruída, "segundos": ...}.
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            return self.rebuild()
+        inicio = time.perf_counter()
+        tamanho, mtime_ns, sha256 = workbook_fingerprint(self.file_path, self.sheet_name)
+        if sha256 == manifest.get("sha256"):
+            return {"novas": None, "particoes": [], "completa": False, "segundos": time.perf_counter() - inicio}
+
+        # Recomeça na última linha já lida para conferir que ela não mudou
+        linhas = iter_sheet_rows(self.file_path, self.sheet_name, start_row=manifest["ultima_linha"])
+        numero, valores = next(linhas, (None, None))
+        if numero != manifest["ultima_linha"] or _row_signature(valores) != manifest["assinatura"]:
+            return self.rebuild()
+
+        dados, ultima, assinatura = [], numero, manifest["assinatura"]
+        for numero, valores in linhas:
+            # Linhas vazias (formatadas para receber os próximos meses) não contam
+            if any(v is not None for v in valores):
+                dados.append(valores)
+                ultima, assinatura = numero, _row_signature(valores)
+
+        df = self._frame(manifest["colunas"], dados)
+        tocadas = self._write_partitions(df, manifest)
+        manifest.update(ultima_linha=ultima, assinatura=assinatura, size=tamanho, mtime_ns=mtime_ns, sha256=sha256)
+        self._save_manifest(manifest)
+        return {"novas": df, "particoes": tocadas, "completa": False, "segundos": time.perf_counter() - inicio}
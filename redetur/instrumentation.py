@@ -0,0 +1,217 @@
+import functools
+import json
+import os
+import time
+from collections import deque
+
+import pandas as pd
+
+from redetur.memo import estimate_nbytes
+
+# ================================================
+# INSTRUMENTAÇÃO POR SEÇÃO (TEMPO, LINHAS, BYTES, CACHE)
+# ================================================
+#
+# Opcional e desligada por padrão. O app informa onde está o Recorder da
+# sessão (set_provider); sem Recorder, instrument() não mede nada.
+#
+#   with instrument("filtros") as span:
+#       df_filtrado = ...
+#       span.rows = len(df_filtrado)
+#
+#   @instrument("create_corporate_bar_chart", payload=True)
+#   def create_corporate_bar_chart(df, ...): ...
+
+ENV_DEBUG = "REDETUR_DEBUG"
+
+_provider = lambda: None  # noqa: E731
+
+
+def env_enabled():
+    return os.environ.get(ENV_DEBUG, "").strip().lower() in ("1", "true", "sim", "yes")
+
+
+def set_provider(func):
+    """Define a função que devolve o Recorder ativo (ou None) no contexto atual."""
+    global _provider
+    _provider = func
+
+
+def current_recorder():
+    try:
+        return _provider()
+    except Exception:
+        return None
+
+
+def payload_nbytes(value):
+    # Bytes que o objeto ocupa ao ser enviado ao navegador
+    if value is None:
+        return 0
+    modulo = type(value).__module__
+    if modulo.startswith("plotly"):
+        return len(value.to_json())  # mesmo JSON que o st.plotly_chart envia
+    if modulo.startswith("pyecharts"):
+        return len(value.dump_options())
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return estimate_nbytes(value)  # DataFrames: tamanho em memória como aproximação
+
+
+def _count_rows(args, kwargs):
+    # Linhas do primeiro DataFrame recebido pela função
+    for valor in list(args) + list(kwargs.values()):
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            return len(valor)
+    return None
+
+
+class Recorder:
+    """Medições de uma sessão, agrupadas por rerun do script.
+
+    Guarda no máximo `max_records` registros (os mais antigos saem). Reruns
+    de fragmentos não passam por new_run() e entram no último rerun.
+    """
+
+    def __init__(self, max_records=5000):
+        self.records = deque(maxlen=max_records)
+        self.run = 0
+        self._stack = []
+        self._run_started = time.perf_counter()
+
+    def new_run(self):
+        self.run += 1
+        self._stack.clear()
+        self._run_started = time.perf_counter()
+
+    def last_run(self):
+        return [r for r in self.records if r["rerun"] == self.run]
+
+    def to_frame(self, records=None):
+        colunas = ["rerun", "secao", "nivel", "inicio_ms", "ms", "linhas", "bytes", "cache_hits", "cache_misses", "erro"]
+        linhas = list(self.records if records is None else records)
+        frame = pd.DataFrame(linhas, columns=colunas)
+        return frame.sort_values(["rerun", "inicio_ms"], kind="stable").reset_index(drop=True)
+
+    def summary(self, records=None):
+        # Totais por seção: chamadas, tempo e cache
+        frame = self.to_frame(records)
+        if frame.empty:
+            return frame
+        return (
+            frame.groupby("secao", sort=False)
+            .agg(chamadas=("ms", "size"), ms=("ms", "sum"), linhas=("linhas", "sum"),
+                 bytes=("bytes", "sum"), cache_hits=("cache_hits", "sum"), cache_misses=("cache_misses", "sum"))
+            .sort_values("ms", ascending=False)
+            .reset_index()
+        )
+
+    def to_jsonl(self):
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in self.records)
+
+    def clear(self):
+        self.records.clear()
+
+
+class Span:
+    """Uma medição: usada como `with instrument(...)` ou como decorador."""
+
+    def __init__(self, name, payload=False):
+        self.name = name
+        self.payload = payload
+        self.rows = None
+        self.bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._recorder = None
+        self._start = None
+        self._end = None
+
+    def __enter__(self):
+        self._recorder = current_recorder()
+        if self._recorder is not None:
+            self._recorder._stack.append(self)
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        recorder = self._recorder
+        if recorder is None:
+            return False
+        fim = self._end or time.perf_counter()
+        nivel = len(recorder._stack) - 1
+        if recorder._stack and recorder._stack[-1] is self:
+            recorder._stack.pop()
+        recorder.records.append({
+            "rerun": recorder.run,
+            "secao": self.name,
+            "nivel": max(nivel, 0),
+            "inicio_ms": round((self._start - recorder._run_started) * 1000, 3),
+            "ms": round((fim - self._start) * 1000, 3),
+            "linhas": self.rows,
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "erro": exc_type.__name__ if exc_type is not None else None,
+        })
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_recorder() is None:
+                return func(*args, **kwargs)
+            with Span(self.name) as span:
+                resultado = func(*args, **kwargs)
+                span.stop()  # serializar para medir os bytes não entra no tempo
+                span.rows = _count_rows(args, kwargs)
+                if self.payload:
+                    span.add_bytes(payload_nbytes(resultado))
+            return resultado
+        return wrapper
+
+    def stop(self):
+        if self._end is None:
+            self._end = time.perf_counter()
+
+    @property
+    def active(self):
+        return self._recorder is not None
+
+    def add_bytes(self, nbytes):
+        if self._recorder is not None:
+            self.bytes += int(nbytes)
+
+    def add_payload(self, value):
+        # Soma o tamanho serializado de `value` (só calcula com a instrumentação ligada)
+        if self._recorder is not None:
+            self.bytes += payload_nbytes(value)
+
+    def cache(self, hit):
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+
+def instrument(name, payload=False):
+    """Mede uma seção (context manager) ou cada chamada de uma função (decorador).
+
+    Com `payload=True`, o decorador soma em `bytes` o tamanho serializado do
+    valor devolvido (figuras Plotly, gráficos pyecharts, DataFrames).
+    """
+    return Span(name, payload)
+
+
+def record_cache(hit):
+    # Registra hit/miss na seção aberta mais interna, se houver
+    recorder = current_recorder()
+    if recorder is not None and recorder._stack:
+        recorder._stack[-1].cache(hit)
+
+
+def record_payload(value):
+    # Soma o tamanho serializado de `value` na seção aberta mais interna
+    recorder = current_recorder()
+    if recorder is not None and recorder._stack:
+        recorder._stack[-1].add_payload(value)
@@ -0,0 +1,91 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ================================================
+# CACHE LRU COM ORÇAMENTO DE MEMÓRIA
+# ================================================
+
+
+def estimate_nbytes(value):
+    # Estimativa do tamanho em memória dos objetos guardados no cache
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Cache LRU thread-safe limitado por número de entradas e por bytes.
+
+    Compartilhado entre as sessões do Streamlit (via st.cache_resource);
+    os valores guardados não devem ser alterados por quem os lê.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, max_entries=512):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = estimate_nbytes(value)
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._data.pop(key)[1]
+            if size > self.max_bytes:
+                return value  # maior que o orçamento inteiro: não guarda
+            self._data[key] = (value, size)
+            self.nbytes += size
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+        # Cálculo fora do lock para não serializar as sessões
+        return self.put(key, compute())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def _evict(self):
+        while self._data and (self.nbytes > self.max_bytes or len(self._data) > self.max_entries):
+            _, (_, size) = self._data.popitem(last=False)
+            self.nbytes -= size
@@ -0,0 +1,199 @@
+import math
+
+import numpy as np
+
+# ================================================
+# GRÁFICOS VETORIAIS DESENHADOS DIRETO NO FPDF
+# ================================================
+#
+# Só a API pública do FPDF (rect, line, cell, set_*_color). Ao final de cada
+# gráfico fonte, traço e preenchimento voltam ao padrão; a cor do texto fica
+# em COR_TEXTO e quem chama define a sua em seguida.
+
+# Mesma sequência de cores padrão do Plotly usada nos gráficos da tela
+PALETTE = [
+    (99, 110, 250), (239, 85, 59), (0, 204, 150), (171, 99, 250), (255, 161, 90),
+    (25, 211, 243), (255, 102, 146), (182, 232, 128), (255, 151, 255), (254, 203, 82),
+]
+COR_TEXTO = (68, 68, 68)
+COR_GRADE = (225, 229, 236)
+COR_OUTROS = (190, 190, 190)
+
+
+def _fmt_valor(valor):
+    # Rótulos curtos para eixos e barras (ex.: 1,2M / 350,5k)
+    for limite, sufixo in ((1e9, "B"), (1e6, "M"), (1e3, "k")):
+        if abs(valor) >= limite:
+            return f"{valor / limite:,.1f}{sufixo}".replace(".", ",")
+    return f"{valor:,.0f}".replace(",", ".")
+
+
+def _passo_eixo(maximo, n=5):
+    # Passo "redondo" (1, 2, 2,5 ou 5 x 10^k) para ~n linhas de grade
+    if maximo <= 0:
+        return 1.0
+    bruto = maximo / n
+    base = 10 ** math.floor(math.log10(bruto))
+    for mult in (1, 2, 2.5, 5, 10):
+        if bruto <= mult * base:
+            return mult * base
+    return 10 * base
+
+
+def _ajustar_texto(pdf, texto, largura):
+    texto = str(texto)
+    if pdf.get_string_width(texto) <= largura:
+        return texto
+    while texto and pdf.get_string_width(texto + "...") > largura:
+        texto = texto[:-1]
+    return texto + "..."
+
+
+def ensure_space(pdf, h):
+    # Garante altura `h` livre na página atual (gráfico e título juntos)
+    if pdf.get_y() + h > pdf.page_break_trigger:
+        pdf.add_page()
+    return pdf.get_y()
+
+
+def _estado_fonte(pdf):
+    return pdf.font_style, pdf.font_size_pt
+
+
+def _restaurar_cores(pdf, estado):
+    estilo, tamanho = estado
+    pdf.set_font(pdf.font_family, estilo, tamanho)
+    pdf.set_draw_color(0)
+    pdf.set_fill_color(255)
+    pdf.set_line_width(0.2)
+
+
+def _setor(pdf, cx, cy, r, inicio, fim, cor):
+    # Setor de pizza preenchido com raios do centro até o arco, próximos o
+    # bastante (menos que a espessura do traço) para não deixar frestas
+    espessura = 0.6
+    passos = max(1, math.ceil((fim - inicio) * r / (espessura * 0.8)))
+    pdf.set_draw_color(*cor)
+    pdf.set_line_width(espessura)
+    for angulo in np.linspace(inicio, fim, passos + 1):
+        pdf.line(cx, cy, cx + r * math.cos(angulo), cy + r * math.sin(angulo))
+
+
+def _divisoria(pdf, cx, cy, r, angulo):
+    # Linha branca entre dois setores
+    pdf.set_draw_color(255)
+    pdf.set_line_width(0.4)
+    pdf.line(cx, cy, cx + r * math.cos(angulo), cy + r * math.sin(angulo))
+
+
+def draw_pie_chart(pdf, labels, values, x=10, w=190, h=80, max_slices=10):
+    """Pizza com legenda (rótulo e %) à direita, desenhada com primitivas do FPDF.
+
+    Fatias além das `max_slices - 1` maiores são somadas em "Outros".
+    Desenha a partir da posição vertical atual e avança o cursor.
+    """
+    valores = np.asarray(values, dtype="float64")
+    valores = np.where(np.isfinite(valores) & (valores > 0), valores, 0.0)
+    rotulos = np.asarray([str(l) for l in labels], dtype=object)
+    ordem = np.argsort(-valores, kind="stable")
+    rotulos, valores = rotulos[ordem], valores[ordem]
+    if len(valores) > max_slices:
+        outros = valores[max_slices - 1:].sum()
+        rotulos = np.append(rotulos[:max_slices - 1], "Outros")
+        valores = np.append(valores[:max_slices - 1], outros)
+    total = valores.sum()
+
+    estado = _estado_fonte(pdf)
+    y = ensure_space(pdf, h)
+    r = h / 2 - 2
+    cx, cy = x + r + 2, y + h / 2
+
+    if total <= 0:
+        _setor(pdf, cx, cy, r, -math.pi / 2, 3 * math.pi / 2, COR_GRADE)
+    else:
+        angulo = -math.pi / 2  # começa no topo e segue no sentido horário, como no Plotly
+        limites = []
+        for i, valor in enumerate(valores):
+            if valor <= 0:
+                continue
+            fim = angulo + 2 * math.pi * valor / total
+            cor = COR_OUTROS if rotulos[i] == "Outros" and i == len(valores) - 1 else PALETTE[i % len(PALETTE)]
+            _setor(pdf, cx, cy, r, angulo, fim, cor)
+            limites.append(angulo)
+            angulo = fim
+        if len(limites) > 1:
+            for limite in limites:
+                _divisoria(pdf, cx, cy, r, limite)
+
+    # Legenda
+    pdf.set_font(pdf.font_family, "", 8)
+    pdf.set_text_color(*COR_TEXTO)
+    lx = cx + r + 10
+    largura_legenda = min(x + w - lx - 6, 90)
+    linha = min(6, (h - 4) / max(len(valores), 1))
+    ly = cy - linha * len(valores) / 2
+    for i, (rotulo, valor) in enumerate(zip(rotulos, valores)):
+        cor = COR_OUTROS if rotulo == "Outros" and i == len(valores) - 1 else PALETTE[i % len(PALETTE)]
+        pdf.set_fill_color(*cor)
+        pdf.rect(lx, ly + i * linha + (linha - 3) / 2, 3, 3, "F")
+        pct = f"{100 * valor / total:.1f}%".replace(".", ",") if total > 0 else "-"
+        pdf.set_xy(lx + 5, ly + i * linha)
+        pdf.cell(largura_legenda - 20, linha, _ajustar_texto(pdf, rotulo, largura_legenda - 20), 0, 0, "L")
+        pdf.cell(15, linha, pct, 0, 0, "R")
+
+    _restaurar_cores(pdf, estado)
+    pdf.set_xy(pdf.l_margin, y + h)
+
+
+def draw_bar_chart(pdf, labels, values, x=10, w=190, h=80, y_title=None):
+    """Barras verticais com grade, eixo Y formatado e valor sobre cada barra.
+
+    Desenha a partir da posição vertical atual e avança o cursor.
+    """
+    valores = np.nan_to_num(np.asarray(values, dtype="float64"))
+    rotulos = [str(l) for l in labels]
+
+    estado = _estado_fonte(pdf)
+    y = ensure_space(pdf, h)
+    pdf.set_font(pdf.font_family, "", 7)
+    pdf.set_text_color(*COR_TEXTO)
+
+    # Área de plotagem: margem à esquerda para o eixo Y e embaixo para os rótulos
+    esquerda, base = 18, 8
+    px0, py0 = x + esquerda, y + 4
+    pw, ph = w - esquerda - 2, h - base - 4
+
+    maximo = float(valores.max()) if len(valores) and valores.max() > 0 else 1.0
+    passo = _passo_eixo(maximo)
+    topo = passo * math.ceil(maximo / passo)
+
+    pdf.set_draw_color(*COR_GRADE)
+    pdf.set_line_width(0.2)
+    for tick in np.arange(0, topo + passo / 2, passo):
+        ty = py0 + ph - ph * tick / topo
+        pdf.line(px0, ty, px0 + pw, ty)
+        pdf.set_xy(x, ty - 2)
+        pdf.cell(esquerda - 2, 4, _fmt_valor(tick), 0, 0, "R")
+    if y_title:
+        pdf.set_xy(x, y - 1)
+        pdf.cell(esquerda + 20, 4, y_title, 0, 0, "L")
+
+    if len(valores):
+        slot = pw / len(valores)
+        largura = slot * 0.7
+        pdf.set_fill_color(*PALETTE[0])
+        for i, (rotulo, valor) in enumerate(zip(rotulos, valores)):
+            bx = px0 + i * slot + (slot - largura) / 2
+            altura = ph * max(valor, 0) / topo
+            if altura > 0:
+                pdf.rect(bx, py0 + ph - altura, largura, altura, "F")
+            pdf.set_xy(px0 + i * slot, py0 + ph - altura - 4)
+            pdf.cell(slot, 4, _ajustar_texto(pdf, _fmt_valor(valor), slot), 0, 0, "C")
+            pdf.set_xy(px0 + i * slot, py0 + ph + 1)
+            pdf.cell(slot, 4, _ajustar_texto(pdf, rotulo, slot), 0, 0, "C")
+
+    pdf.set_draw_color(*COR_TEXTO)
+    pdf.line(px0, py0 + ph, px0 + pw, py0 + ph)
+
+    _restaurar_cores(pdf, estado)
+    pdf.set_xy(pdf.l_margin, y + h)
@@ -0,0 +1,70 @@
+import pandas as pd
+
+# ================================================
+# TABELAS LONGAS NO PDF (CABEÇALHO REPETIDO A CADA PÁGINA)
+# ================================================
+
+
+def format_currency(values):
+    # "R$ 1,234.56" para a coluna inteira de uma vez; vazios viram "-"
+    serie = pd.Series(values, dtype="float64")
+    return serie.map("R$ {:,.2f}".format, na_action="ignore").fillna("-").to_numpy(dtype=object)
+
+
+def format_text(values):
+    # Texto da coluna inteira; vazios viram "-"
+    return pd.Series(values, dtype=object).fillna("-").astype(str).to_numpy(dtype=object)
+
+
+class PDFTable:
+    """Escreve uma tabela linha a linha a partir de colunas já formatadas.
+
+    A quebra de página é verificada antes de cada linha (nunca no meio dela)
+    e o cabeçalho da tabela é repetido no topo de cada página nova.
+    """
+
+    def __init__(self, pdf, headers, widths, aligns=None, row_height=8, font_size=8,
+                 header_fill=(200, 220, 255)):
+        self.pdf = pdf
+        self.headers = list(headers)
+        self.widths = list(widths)
+        self.aligns = list(aligns) if aligns else ["L"] * len(self.headers)
+        self.row_height = row_height
+        self.font_size = font_size
+        self.header_fill = header_fill
+        self.rows_written = 0
+
+    def write_header(self):
+        pdf = self.pdf
+        pdf.set_font(pdf.font_family, "", self.font_size)
+        pdf.set_fill_color(*self.header_fill)
+        ultimo = len(self.headers) - 1
+        for i, (titulo, largura) in enumerate(zip(self.headers, self.widths)):
+            pdf.cell(largura, self.row_height, titulo, 1, 1 if i == ultimo else 0, "C", 1)
+        pdf.set_fill_color(255, 255, 255)
+
+    def write_rows(self, *columns):
+        # columns: uma sequência de strings por coluna, todas do mesmo tamanho
+        pdf = self.pdf
+        h = self.row_height
+        celulas = list(zip(self.widths, self.aligns))
+        ultimo = len(celulas) - 1
+        for linha in zip(*columns):
+            if pdf.get_y() + h > pdf.page_break_trigger:
+                pdf.add_page()
+                self.write_header()
+            for i, (texto, (largura, alinhamento)) in enumerate(zip(linha, celulas)):
+                pdf.cell(largura, h, texto, 1, 1 if i == ultimo else 0, alinhamento)
+            self.rows_written += 1
+
+    def write_frame(self, df, formatters, chunk_size=2000):
+        """Escreve o DataFrame em blocos de `chunk_size` linhas.
+
+        formatters: {coluna: função(valores) -> array de strings}, na ordem
+        das colunas da tabela. Só um bloco formatado fica em memória por vez.
+        """
+        self.write_header()
+        colunas = list(formatters.items())
+        for inicio in range(0, len(df), chunk_size):
+            bloco = df.iloc[inicio:inicio + chunk_size]
+            self.write_rows(*(formatar(bloco[coluna].to_numpy()) for coluna, formatar in colunas))
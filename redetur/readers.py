@@ -0,0 +1,142 @@
+import os
+import zipfile
+
+import pandas as pd
+
+try:
+    import python_calamine  # noqa: F401
+    HAS_CALAMINE = True
+except ImportError:  # engine "calamine" do pandas indisponível; usa o openpyxl em streaming
+    HAS_CALAMINE = False
+
+# ================================================
+# LEITORES DE PLANILHA (PROJEÇÃO DE COLUNAS E FILTRO DE LINHAS NA LEITURA)
+# ================================================
+#
+# Os painéis só usam algumas colunas da aba. read_sheet lê apenas essas
+# colunas e descarta, durante a própria leitura, as linhas sem valor nas
+# colunas obrigatórias:
+#
+#   df = read_sheet(path, "Planilha1", columns=COLUNAS_LEITURA, required=["Agencias"])
+#
+# Engines (REDETUR_EXCEL_ENGINE escolhe uma; padrão: calamine se instalado,
+# senão streaming). Se a engine falhar, a leitura é refeita pelo
+# pd.read_excel com openpyxl.
+#
+#   calamine   pd.read_excel(engine="calamine") (python-calamine, em Rust)
+#   streaming  openpyxl em modo somente leitura (read_only), linha a linha;
+#              só as colunas projetadas são guardadas
+#   openpyxl   pd.read_excel padrão
+
+ENV_ENGINE = "REDETUR_EXCEL_ENGINE"
+
+# Textos que o pd.read_excel lê como ausentes (na_values padrão do pandas)
+_NA_TEXTO = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+# Erros de estrutura do arquivo que fazem a leitura cair para o pd.read_excel
+_FALHAS = (KeyError, IndexError, ValueError, zipfile.BadZipFile)
+
+
+# ---------- openpyxl em modo somente leitura ----------
+
+def _as_cell(valor):
+    # Mesmas conversões do pd.read_excel: número inteiro vira int, textos "NA" etc. viram ausentes
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    if isinstance(valor, str) and valor in _NA_TEXTO:
+        return None
+    return valor
+
+
+def _read_streaming(file_path, sheet_name, columns, required):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        ws.reset_dimensions()  # dimensão gravada no arquivo nem sempre é confiável
+        linhas = ws.iter_rows(values_only=True)
+        nomes = {}
+        for indice, valor in enumerate(next(linhas, ())):
+            nome = f"Unnamed: {indice}" if valor is None else valor
+            if nome not in nomes.values() and (columns is None or nome in columns):
+                nomes[indice] = nome
+        obrigatorias = [indice for indice, nome in nomes.items() if nome in (required or ())]
+        faltando = set(required or ()) - {nomes[i] for i in obrigatorias}
+        if faltando:
+            raise KeyError(sorted(faltando))
+
+        dados = {indice: [] for indice in nomes}
+        total, fim = 0, 0
+        for valores in linhas:
+            projetados = {i: _as_cell(valores[i]) if i < len(valores) else None for i in dados}
+            if any(projetados[i] is None for i in obrigatorias):
+                continue
+            for indice, lista in dados.items():
+                lista.append(projetados[indice])
+            total += 1
+            if any(v is not None for v in projetados.values()):
+                fim = total
+    finally:
+        wb.close()
+
+    # Linhas vazias no fim da aba (formatadas para os próximos meses) não entram
+    df = pd.DataFrame({nomes[indice]: lista[:fim] for indice, lista in sorted(dados.items())})
+    # Como no read_excel, colunas sem nenhum valor (ex.: '%') ficam float
+    vazias = [c for c in df.columns if df[c].isna().all()]
+    df[vazias] = df[vazias].astype("float64")
+    return df
+
+
+# ---------- engines do pandas ----------
+
+def _read_pandas(file_path, sheet_name, columns, required, engine=None, **read_kwargs):
+    colunas = None if columns is None else set(columns)
+    usecols = None if colunas is None else (lambda c: c in colunas)
+    df = pd.read_excel(file_path, sheet_name=sheet_name, usecols=usecols, engine=engine, **read_kwargs)
+    if required:
+        df = df.dropna(subset=list(required)).reset_index(drop=True)
+    return df
+
+
+def _read_calamine(file_path, sheet_name, columns, required):
+    return _read_pandas(file_path, sheet_name, columns, required, engine="calamine")
+
+
+def _read_openpyxl(file_path, sheet_name, columns, required):
+    return _read_pandas(file_path, sheet_name, columns, required, engine="openpyxl")
+
+
+ENGINES = {"streaming": _read_streaming, "openpyxl": _read_openpyxl}
+if HAS_CALAMINE:
+    ENGINES["calamine"] = _read_calamine
+
+
+def default_engine():
+    escolhida = os.environ.get(ENV_ENGINE, "").strip().lower()
+    if escolhida in ENGINES:
+        return escolhida
+    return "calamine" if HAS_CALAMINE else "streaming"
+
+
+def read_sheet(file_path, sheet_name=0, columns=None, required=None, engine=None, **read_kwargs):
+    """Lê uma aba (cabeçalho na primeira linha) só com as colunas pedidas.
+
+    `columns`: colunas a ler (as que não existem na aba são ignoradas);
+    `required`: colunas obrigatórias, linhas sem valor nelas são descartadas
+    (como dropna(subset=required)). Argumentos extras do pd.read_excel
+    levam direto ao openpyxl. Se a engine escolhida falhar, a aba é relida
+    pelo openpyxl.
+    """
+    if read_kwargs:
+        return _read_pandas(file_path, sheet_name, columns, required, engine="openpyxl", **read_kwargs)
+    engine = engine or default_engine()
+    try:
+        return ENGINES[engine](file_path, sheet_name, columns, required)
+    except _FALHAS:
+        if engine == "openpyxl":
+            raise
+        return _read_openpyxl(file_path, sheet_name, columns, required)
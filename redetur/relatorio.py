@@ -0,0 +1,181 @@
+import functools
+import multiprocessing
+import os
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from redetur.schema import MES_DTYPE, ORDEM_MESES, make_period
+
+# ================================================
+# RELATÓRIO DE VENDAS AGÊNCIAS x FORNECEDORES (UMA ABA POR FORNECEDOR)
+# ================================================
+#
+# Cada aba tem algumas linhas de título, a linha de cabeçalho
+# ("Agência:", "Janeiro:", ...) e uma linha por agência. As abas são lidas
+# (em paralelo, nas planilhas grandes) e unidas numa tabela longa tipada:
+#
+#   Fornecedor | Linha | Agencia | Ano | Mês | period | Valor
+#
+# O ano vem do título de alguma aba (ex.: "Relatório Orinter jan/fev/2025").
+
+RELATORIO_PATH = "Relatório de vendas agências x Fornecedores.xlsx"
+
+# Planilhas menores que isso são lidas em sequência: subir os processos
+# (spawn + import do pandas, ~1 s por processo) custa mais do que ler as abas
+MIN_BYTES_PARALELO = 4 * 1024 * 1024
+
+_MESES_NORMALIZADOS = [
+    "janeiro", "fevereiro", "marco", "abril", "maio", "junho",
+    "julho", "agosto", "setembro", "outubro", "novembro", "dezembro",
+]
+
+
+_ANO = r"(?<!\d)((?:19|20)\d{2})(?!\d)"
+
+
+# Os mesmos cabeçalhos se repetem em todas as abas: cada texto é normalizado uma vez só
+@functools.lru_cache(maxsize=1024)
+def normalize_col(col_name):
+    col_name = str(col_name).strip().lower()
+    col_name = ''.join(c for c in unicodedata.normalize('NFD', col_name) if unicodedata.category(c) != 'Mn')
+    return col_name
+
+
+@functools.lru_cache(maxsize=1024)
+def month_of(col_name):
+    # "Janeiro:", "MARÇO" -> nome canônico do mês; None se não for coluna de mês
+    normalizado = normalize_col(col_name)
+    for mes, nome in zip(_MESES_NORMALIZADOS, ORDEM_MESES):
+        if mes in normalizado:
+            return nome
+    return None
+
+
+def normalize_series(values):
+    # normalize_col para uma coluna inteira de uma vez (operações de texto do pandas)
+    texto = pd.Series(values, copy=False).astype("string")
+    return texto.str.normalize("NFD").str.replace("[\u0300-\u036f]", "", regex=True).str.strip().str.lower()
+
+
+def find_header_row(raw):
+    # Posição da primeira linha cuja primeira coluna contém "agência"; None se não houver
+    if raw.empty:
+        return None
+    achadas = normalize_series(raw.iloc[:, 0]).str.contains("agencia", regex=False).fillna(False).to_numpy(dtype=bool)
+    return int(achadas.argmax()) if achadas.any() else None
+
+
+def infer_schema(colunas):
+    """Coluna de agência e colunas de mês de um cabeçalho.
+
+    Devolve (coluna da agência, {coluna: mês canônico}); os textos passam
+    pelos mapeamentos em cache de normalize_col/month_of.
+    """
+    agencia_col = next((c for c in colunas if "agencia" in normalize_col(c)), colunas[0])
+    meses = {c: month_of(c) for c in colunas if c != agencia_col and month_of(c) is not None}
+    return agencia_col, meses
+
+
+def find_year(raw):
+    # Primeiro ano (19xx/20xx) escrito nas células do bloco, ex.: o título da aba
+    textos = raw.stack().astype("string")
+    anos = textos.str.extract(_ANO, expand=False).dropna()
+    return int(anos.iloc[0]) if len(anos) else None
+
+
+def parse_supplier_sheet(source, sheet):
+    """Lê uma aba de fornecedor e devolve (linhas no formato longo, ano).
+
+    `source` é o caminho da planilha (nos processos do pool) ou um
+    pd.ExcelFile já aberto. O cabeçalho é a primeira linha cuja primeira
+    coluna contém "Agência"; abas sem ele são ignoradas (None). O ano é o
+    que aparece acima do cabeçalho (None se não houver).
+    """
+    if isinstance(source, pd.ExcelFile):
+        raw = source.parse(sheet, header=None)
+    else:
+        raw = pd.read_excel(source, sheet_name=sheet, header=None)
+    header_index = find_header_row(raw)
+    if header_index is None:
+        return None, None
+
+    colunas = [str(c).strip() for c in raw.iloc[header_index]]
+    corpo = raw.iloc[header_index + 1:]
+    corpo.columns = colunas
+    agencia_col, meses = infer_schema(colunas)
+
+    corpo = corpo[corpo[agencia_col].notna()]
+    # Todas as colunas de mês convertidas de uma vez, já empilhadas (mês a mês)
+    bloco = corpo[list(meses)].to_numpy(dtype=object)
+    valores = pd.to_numeric(pd.Series(bloco.ravel(order="F")), errors="coerce").astype("float64")
+    n_linhas, n_meses = bloco.shape
+    longo = pd.DataFrame({
+        "Fornecedor": sheet,
+        "Linha": np.tile(corpo.index.to_numpy() + 1, n_meses).astype("int32"),  # linha na planilha (1 = primeira)
+        "Agencia": np.tile(corpo[agencia_col].astype(str).str.strip().to_numpy(dtype=object), n_meses),
+        "Mês": pd.Categorical(np.repeat([meses[c] for c in meses], n_linhas), dtype=MES_DTYPE),
+        "Valor": valores,
+    })
+    return longo, find_year(raw.iloc[:header_index])
+
+
+def load_relatorio(file_path=RELATORIO_PATH, max_workers=None, min_bytes=MIN_BYTES_PARALELO, ano=None):
+    """Todas as abas da planilha numa tabela longa tipada.
+
+    Em planilhas a partir de `min_bytes`, cada aba é lida (e tem o
+    cabeçalho detectado) num processo do pool, com até `max_workers`
+    processos (padrão: um por núcleo); `max_workers=1` força a leitura
+    em sequência. `ano` é o ano do relatório; por padrão, o primeiro
+    encontrado nos títulos das abas (sem ano, Ano e period ficam vazios).
+    """
+    excel_file = pd.ExcelFile(file_path)
+    sheet_names = excel_file.sheet_names
+    workers = min(max_workers or os.cpu_count() or 1, len(sheet_names))
+
+    if workers < 2 or os.path.getsize(file_path) < min_bytes:
+        partes = [parse_supplier_sheet(excel_file, sheet) for sheet in sheet_names]
+    else:
+        excel_file.close()
+        # spawn: os workers não herdam as threads do servidor do Streamlit
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as pool:
+            partes = list(pool.map(parse_supplier_sheet, [file_path] * len(sheet_names), sheet_names))
+
+    if ano is None:
+        ano = next((a for _, a in partes if a is not None), None)
+    partes = [p for p, _ in partes if p is not None and len(p)]
+    if not partes:
+        return pd.DataFrame({
+            "Fornecedor": pd.Categorical([], categories=sheet_names),
+            "Linha": pd.Series([], dtype="int32"),
+            "Agencia": pd.Categorical([]),
+            "Ano": pd.Series([], dtype="Int64"),
+            "Mês": pd.Series([], dtype=MES_DTYPE),
+            "period": pd.Series([], dtype="Int64"),
+            "Valor": pd.Series([], dtype="float64"),
+        })
+    df = pd.concat(partes, ignore_index=True)
+    # Fornecedores na ordem das abas; linhas de cada aba na ordem da planilha
+    df["Fornecedor"] = pd.Categorical(df["Fornecedor"], categories=sheet_names)
+    df["Agencia"] = df["Agencia"].astype("category")
+    df.insert(3, "Ano", pd.Series(ano, index=df.index, dtype="Int64"))
+    df.insert(5, "period", make_period(df["Ano"], pd.Series(df["Mês"].cat.codes + 1, index=df.index)).astype("Int64"))
+    return df.sort_values(["Fornecedor", "Linha", "Mês"], kind="stable").reset_index(drop=True)
+
+
+def to_wide(df):
+    """Tabela longa -> uma linha por agência/fornecedor e uma coluna por mês.
+
+    Mesmo formato que os apps montavam com pd.concat das abas:
+    Agencia, <meses presentes, em ordem>, Fornecedor.
+    """
+    wide = df.pivot(index=["Fornecedor", "Linha", "Agencia"], columns="Mês", values="Valor")
+    meses = [m for m in ORDEM_MESES if m in wide.columns]
+    wide = wide[meses].reset_index()
+    wide.columns.name = None
+    wide["Agencia"] = wide["Agencia"].astype(str)
+    wide["Fornecedor"] = wide["Fornecedor"].astype(str)
+    return wide[["Agencia"] + meses + ["Fornecedor"]]
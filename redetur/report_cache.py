@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import threading
+
+# ================================================
+# CACHE EM DISCO ENDEREÇADO POR CONTEÚDO (RELATÓRIOS)
+# ================================================
+
+REPORT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "relatorios")
+
+
+def make_key(*parts):
+    # Chave estável a partir de qualquer combinação de valores serializáveis
+    bruto = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Blobs em disco indexados por hash, com limite de tamanho total.
+
+    A escrita é atômica (arquivo temporário + os.replace), então o mesmo
+    diretório pode ser usado pelo Streamlit e pelos processos do lote.
+    Ao passar do limite, os arquivos usados há mais tempo (mtime) saem
+    primeiro; cada leitura atualiza o mtime.
+    """
+
+    def __init__(self, directory=REPORT_CACHE_DIR, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._approx_bytes = None  # estimativa local; o diretório é varrido só ao passar do limite
+        self._lock = threading.Lock()
+
+    def path_for(self, key, suffix=".bin"):
+        return os.path.join(self.directory, key[:2], key + suffix)
+
+    def get_path(self, key, suffix=".bin"):
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def get(self, key, suffix=".bin"):
+        path = self.get_path(key, suffix)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key, data, suffix=".bin"):
+        path = self.path_for(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        with self._lock:
+            if self._approx_bytes is not None:
+                self._approx_bytes += len(data)
+        if self._approx_bytes is None or self._approx_bytes > self.max_bytes:
+            self._evict()
+        return path
+
+    def get_or_create(self, key, create, suffix=".bin"):
+        data = self.get(key, suffix)
+        if data is None:
+            data = create()
+            self.put(key, data, suffix)
+        return data
+
+    def _evict(self):
+        with self._lock:
+            arquivos = []
+            total = 0
+            for raiz, _, nomes in os.walk(self.directory):
+                for nome in nomes:
+                    if nome.endswith(".tmp"):
+                        continue
+                    caminho = os.path.join(raiz, nome)
+                    try:
+                        st = os.stat(caminho)
+                    except OSError:
+                        continue
+                    arquivos.append((st.st_mtime, st.st_size, caminho))
+                    total += st.st_size
+            self._approx_bytes = total
+            if total <= self.max_bytes:
+                return
+            for _, tamanho, caminho in sorted(arquivos):
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    continue
+                total -= tamanho
+                if total <= self.max_bytes:
+                    break
+            self._approx_bytes = total
+
+
+_default_cache = None
+
+
+def get_report_cache():
+    # Instância única por processo (Streamlit ou worker do lote)
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DiskCache()
+    return _default_cache
@@ -0,0 +1,196 @@
+import hashlib
+
+import pandas as pd
+from fpdf import FPDF
+
+from redetur.instrumentation import instrument
+from redetur.pdf_charts import draw_bar_chart, draw_pie_chart, ensure_space
+from redetur.pdf_table import PDFTable, format_currency, format_text
+from redetur.report_cache import get_report_cache, make_key
+
+# ================================================
+# RELATÓRIOS EM PDF (A4 PAISAGEM)
+# ================================================
+
+# Classe PDF personalizada para relatórios
+class PDFReport(FPDF):
+    def __init__(self, orientation='L', unit='mm', format='A4'):
+        super().__init__(orientation=orientation, unit=unit, format=format)
+        self.set_auto_page_break(auto=True, margin=15)
+    
+    def header(self):
+        self.set_font('Arial', 'B', 16)
+        self.cell(0, 10, 'Relatório Business Intelligence - Redetur', 0, 1, 'C')
+        self.ln(5)
+    
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Arial', 'I', 8)
+        self.cell(0, 10, f'Página {self.page_no()}', 0, 0, 'C')
+
+# Versão do layout dos relatórios: entra na chave do cache para invalidar
+# PDFs antigos quando o desenho muda
+REPORT_LAYOUT_VERSION = 4
+
+# Função para gerar PDF de agência em A4 paisagem
+def generate_agency_pdf(agency_name, df_agency):
+    pdf = PDFReport()
+    pdf.add_page()
+    
+    # Configurações básicas
+    pdf.set_font("Arial", size=12)
+    pdf.set_text_color(31, 119, 180)  # Azul corporativo
+    
+    # Cabeçalho do relatório
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(0, 10, f"Agência: {agency_name}", ln=1)
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 10, f"Período: {df_agency['Mês'].min()} a {df_agency['Mês'].max()}", ln=1)
+    pdf.ln(10)
+    
+    # Métricas principais
+    total_sales = df_agency['Vendas'].sum()
+    total_revenue = df_agency['Receita'].sum()
+    
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 10, "Métricas Principais:", ln=1)
+    pdf.set_font("Arial", size=10)
+    
+    col_width = pdf.w / 2.2
+    pdf.cell(col_width, 10, f"Total Vendas: R$ {total_sales:,.2f}", border=1)
+    pdf.cell(col_width, 10, f"Total Receita: R$ {total_revenue:,.2f}", border=1, ln=1)
+    pdf.ln(15)
+    
+    # Gráfico de distribuição por tipo
+    sales_by_type = df_agency.groupby('Tipo', observed=True)['Vendas'].sum().reset_index()
+    if not sales_by_type.empty:
+        ensure_space(pdf, 90)
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(0, 10, "Distribuição por Tipo de Venda:", ln=1)
+        
+        draw_pie_chart(pdf, sales_by_type['Tipo'], sales_by_type['Vendas'])
+        pdf.set_text_color(31, 119, 180)
+        pdf.ln(5)
+    
+    # Gráfico de vendas mensais
+    if 'Mês' in df_agency.columns:
+        sales_by_month = df_agency.groupby('Mês', observed=True)['Vendas'].sum().reset_index()
+        
+        ensure_space(pdf, 90)
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(0, 10, "Vendas Mensais:", ln=1)
+        
+        draw_bar_chart(pdf, sales_by_month['Mês'], sales_by_month['Vendas'], y_title='Total (R$)')
+        pdf.set_text_color(31, 119, 180)
+        pdf.ln(5)
+    
+    # Tabela de detalhes
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 10, "Detalhamento de Vendas:", ln=1)
+    
+    # Preparar dados para tabela
+    table_data = df_agency[['Mês', 'Tipo', 'Fornecedor', 'Vendas', 'Receita']]
+    table_data = table_data.sort_values(['Mês', 'Tipo'])
+    
+    # Tabela em blocos, com cabeçalho repetido a cada página
+    tabela = PDFTable(pdf, ["Mês", "Tipo", "Fornecedor", "Vendas", "Receita"],
+                      [30, 40, 50, 30, 30], aligns=["L", "L", "L", "R", "R"])
+    tabela.write_frame(table_data, {
+        'Mês': format_text,
+        'Tipo': format_text,
+        'Fornecedor': format_text,
+        'Vendas': format_currency,
+        'Receita': format_currency,
+    })
+    
+    return pdf.output(dest='S').encode('latin1')
+
+# Função para gerar PDF de fornecedor em A4 paisagem
+def generate_supplier_pdf(supplier_name, df_supplier):
+    pdf = PDFReport()
+    pdf.add_page()
+    
+    # Configurações básicas
+    pdf.set_font("Arial", size=12)
+    pdf.set_text_color(31, 119, 180)  # Azul corporativo
+    
+    # Cabeçalho do relatório
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(0, 10, f"Fornecedor: {supplier_name}", ln=1)
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 10, f"Período: {df_supplier['Mês'].min()} a {df_supplier['Mês'].max()}", ln=1)
+    pdf.ln(10)
+    
+    # Métricas principais
+    total_sales = df_supplier['Vendas'].sum()
+    total_revenue = df_supplier['Receita'].sum()
+    
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 10, "Métricas Principais:", ln=1)
+    pdf.set_font("Arial", size=10)
+    
+    col_width = pdf.w / 2.2
+    pdf.cell(col_width, 10, f"Total Vendas: R$ {total_sales:,.2f}", border=1)
+    pdf.cell(col_width, 10, f"Total Receita: R$ {total_revenue:,.2f}", border=1, ln=1)
+    pdf.ln(15)
+    
+    # Gráfico de distribuição por agência
+    sales_by_agency = df_supplier.groupby('Agencias', observed=True)['Vendas'].sum().reset_index()
+    if not sales_by_agency.empty:
+        ensure_space(pdf, 90)
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(0, 10, "Distribuição por Agência:", ln=1)
+        
+        draw_pie_chart(pdf, sales_by_agency['Agencias'], sales_by_agency['Vendas'])
+        pdf.set_text_color(31, 119, 180)
+        pdf.ln(5)
+    
+    # Tabela de detalhes
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 10, "Detalhamento de Vendas:", ln=1)
+    
+    # Preparar dados para tabela
+    table_data = df_supplier[['Mês', 'Agencias', 'Tipo', 'Vendas', 'Receita']]
+    table_data = table_data.sort_values(['Mês', 'Agencias'])
+    
+    # Tabela em blocos, com cabeçalho repetido a cada página
+    tabela = PDFTable(pdf, ["Mês", "Agência", "Tipo", "Vendas", "Receita"],
+                      [25, 35, 30, 30, 30], aligns=["L", "L", "L", "R", "R"])
+    tabela.write_frame(table_data, {
+        'Mês': format_text,
+        'Agencias': format_text,
+        'Tipo': format_text,
+        'Vendas': format_currency,
+        'Receita': format_currency,
+    })
+    
+    return pdf.output(dest='S').encode('latin1')
+
+REPORT_GENERATORS = {
+    "agencia": generate_agency_pdf,
+    "fornecedor": generate_supplier_pdf,
+}
+
+def cached_report(kind, name, df_entity, selection=None, data_version=None):
+    """PDF do relatório a partir do cache em disco, gerando só se necessário.
+
+    Com data_version a chave é (tipo, entidade, seleção, versão dos dados);
+    sem ela (ex.: linha de comando) a chave é o hash das próprias linhas.
+    """
+    if data_version is not None:
+        key = make_key("pdf", REPORT_LAYOUT_VERSION, kind, name, selection or {}, data_version)
+    else:
+        conteudo = pd.util.hash_pandas_object(df_entity, index=False).to_numpy().tobytes()
+        key = make_key("pdf", REPORT_LAYOUT_VERSION, kind, name, hashlib.sha256(conteudo).hexdigest())
+    with instrument(f"pdf_{kind}") as span:
+        gerados = []
+        
+        def gerar():
+            gerados.append(name)
+            return REPORT_GENERATORS[kind](name, df_entity)
+        
+        pdf_bytes = get_report_cache().get_or_create(key, gerar, suffix=".pdf")
+        span.rows = len(df_entity)
+        span.add_bytes(len(pdf_bytes))
+        span.cache(not gerados)
+    return pdf_bytes
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from pyecharts import options as opts
+from pyecharts.charts import Sankey
+
+from redetur.aggregations import top_n_with_others
+from redetur.instrumentation import instrument
+
+# ================================================
+# DIAGRAMA SANKEY: Agência -> Fornecedor -> Tipo
+# ================================================
+
+OUTRAS_AGENCIAS = "Outras agências"
+OUTROS_FORNECEDORES = "Outros fornecedores"
+
+
+@instrument("build_sankey_data")
+def build_sankey_data(ag_forn, forn_tipo, top_k=None, value="Vendas"):
+    """Monta as listas de nós e links do Sankey a partir dos agregados
+    Agencias x Fornecedor e Fornecedor x Tipo.
+
+    Os índices dos nós saem de códigos do factorize e os links são somados
+    com bincount, sem iterrows nem busca em dicionário por linha. Com
+    `top_k` só as k maiores agências e fornecedores viram nós próprios;
+    o restante é agrupado em "Outras agências"/"Outros fornecedores".
+    """
+    v_af = ag_forn[value].fillna(0).to_numpy(dtype="float64")
+    v_ft = forn_tipo[value].fillna(0).to_numpy(dtype="float64")
+
+    agencias = top_n_with_others(ag_forn["Agencias"], v_af, top_k, OUTRAS_AGENCIAS)
+    fornecedores = top_n_with_others(
+        pd.concat([ag_forn["Fornecedor"].astype(str), forn_tipo["Fornecedor"].astype(str)], ignore_index=True),
+        np.concatenate([v_af, np.zeros(len(v_ft))]),
+        top_k,
+        OUTROS_FORNECEDORES,
+    )
+    tipos = forn_tipo["Tipo"].astype(str)
+
+    ag_codes, ag_nomes = pd.factorize(agencias)
+    forn_codes, forn_nomes = pd.factorize(fornecedores)
+    tipo_codes, tipo_nomes = pd.factorize(tipos)
+
+    n_ag, n_forn = len(ag_nomes), len(forn_nomes)
+    forn_af, forn_ft = forn_codes[:len(v_af)], forn_codes[len(v_af):]
+
+    sources = np.concatenate([ag_codes, forn_ft + n_ag])
+    targets = np.concatenate([forn_af + n_ag, tipo_codes + n_ag + n_forn])
+    values = np.concatenate([v_af, v_ft])
+
+    # Links repetidos (após agrupar em "Outros") são somados de uma vez
+    n_nodes = n_ag + n_forn + len(tipo_nomes)
+    chaves, inverso = np.unique(sources.astype("int64") * n_nodes + targets, return_inverse=True)
+    somas = np.bincount(inverso, weights=values, minlength=len(chaves))
+
+    nomes = list(ag_nomes) + list(forn_nomes) + list(tipo_nomes)
+    # O ECharts exige nomes únicos: desambigua se uma agência e um fornecedor coincidirem
+    vistos = set()
+    for i, nome in enumerate(nomes):
+        if nome in vistos:
+            nomes[i] = f"{nome} ({'Fornecedor' if i < n_ag + n_forn else 'Tipo'})"
+        vistos.add(nomes[i])
+
+    nodes = [{"name": nome} for nome in nomes]
+    links = [
+        {"source": s, "target": t, "value": v}
+        for s, t, v in zip((chaves // n_nodes).tolist(), (chaves % n_nodes).tolist(), somas.tolist())
+    ]
+    return nodes, links
+
+
+@instrument("create_sankey_diagram", payload=True)
+def create_sankey_diagram(ag_forn, forn_tipo, top_k=None):
+    nodes, links = build_sankey_data(ag_forn, forn_tipo, top_k=top_k)
+    sankey = (
+        Sankey(init_opts=opts.InitOpts(width="100%", height="600px"))
+        .add(
+            series_name="Fluxo de Vendas",
+            nodes=nodes,
+            links=links,
+            linestyle_opt=opts.LineStyleOpts(opacity=0.2, curve=0.5, color="source"),
+            label_opts=opts.LabelOpts(position="right"),
+            node_gap=10,
+        )
+        .set_global_opts(
+            title_opts=opts.TitleOpts(pos_top="5%", pos_left="center"),
+            tooltip_opts=opts.TooltipOpts(trigger="item", trigger_on="mousemove"),
+        )
+    )
+    return sankey
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# ================================================
+# ESQUEMA CANÔNICO DA TABELA DE VENDAS
+# ================================================
+
+ORDEM_MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+               'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+
+# Dimensões categóricas e medidas da tabela Agências x Fornecedores
+DIMENSOES = ["Agencias", "Fornecedor", "Tipo"]
+MEDIDAS = ["Vendas", "Receita"]
+CANONICAL_COLUMNS = DIMENSOES + ["Ano", "Mês", "period"] + MEDIDAS
+
+# Colunas da planilha que os painéis usam; as demais (ex.: '%') nem são lidas
+COLUNAS_LEITURA = DIMENSOES + ["Ano", "Mês"] + MEDIDAS
+
+TIPOS_EXEMPLO = ['Direto', 'Online', 'Indicação', 'Corporativo', 'Promocional']
+
+MES_DTYPE = pd.CategoricalDtype(categories=ORDEM_MESES, ordered=True)
+
+# Aceita o nome do mês com variações de caixa/espaços ou o número (1-12)
+_MES_LOOKUP = {mes.lower(): mes for mes in ORDEM_MESES}
+_MES_LOOKUP.update({"marco": "Março"})
+_MES_LOOKUP.update({str(i + 1): mes for i, mes in enumerate(ORDEM_MESES)})
+
+
+def month_category(values):
+    # Converte nomes/números de mês para o categórico ordenado Janeiro..Dezembro
+    s = pd.Series(values, copy=False)
+    if isinstance(s.dtype, pd.CategoricalDtype) and s.dtype == MES_DTYPE:
+        return s
+    chave = s.astype("string").str.strip().str.lower().str.replace(r"\.0$", "", regex=True)
+    return chave.map(_MES_LOOKUP).astype(MES_DTYPE)
+
+
+def make_period(ano, mes_num):
+    # Período inteiro contínuo: ano * 12 + (mês - 1)
+    return ano * 12 + (mes_num - 1)
+
+
+def _as_int(series):
+    # int64 quando não há valores ausentes, Int64 (anulável) caso contrário
+    if series.isna().any():
+        return series.astype("Int64")
+    return series.astype("int64")
+
+
+def to_canonical(df):
+    """Converte a tabela bruta da planilha para o esquema canônico.
+
+    Agencias/Fornecedor/Tipo viram categóricos, Mês vira categórico
+    ordenado, Ano fica inteiro e a coluna `period` (ano * 12 + mês - 1)
+    permite filtrar e ordenar por período com comparação de inteiros.
+    Demais colunas da planilha são mantidas no final.
+    """
+    df = df.dropna(subset=["Agencias"]).reset_index(drop=True)
+
+    if 'Tipo' not in df.columns:
+        df['Tipo'] = pd.Series(TIPOS_EXEMPLO * (len(df) // len(TIPOS_EXEMPLO) + 1))[:len(df)]
+
+    out = pd.DataFrame(index=df.index)
+    for col in DIMENSOES:
+        out[col] = df[col].astype("category")
+
+    ano = pd.to_numeric(df["Ano"], errors="coerce")
+    mes = month_category(df["Mês"])
+    mes_num = pd.Series(mes.cat.codes, index=df.index).replace(-1, np.nan) + 1
+    out["Ano"] = _as_int(ano)
+    out["Mês"] = mes
+    out["period"] = _as_int(make_period(ano, mes_num))
+
+    # Medidas em float64: float32 perde os centavos na casa dos milhões
+    for col in MEDIDAS:
+        out[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+
+    extras = [col for col in df.columns if col not in out.columns]
+    for col in extras:
+        out[col] = df[col]
+
+    return out
+
+
+def concat_canonical(frames):
+    """Concatena tabelas canônicas mantendo as dimensões categóricas.
+
+    Cada parte pode ter um conjunto próprio de categorias (agências ou
+    fornecedores novos); todas passam para a união ordenada antes do
+    concat, que de outra forma convertia as colunas para texto.
+    """
+    frames = [f for f in frames if f is not None]
+    nao_vazios = [f for f in frames if len(f)]
+    frames = nao_vazios or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+    ajustados = [f.copy(deep=False) for f in frames]
+    for col in DIMENSOES:
+        if not all(col in f.columns and isinstance(f[col].dtype, pd.CategoricalDtype) for f in ajustados):
+            continue
+        categorias = pd.Index(sorted(set().union(*(f[col].cat.categories for f in ajustados))))
+        for f in ajustados:
+            f[col] = f[col].cat.set_categories(categorias)
+    return pd.concat(ajustados, ignore_index=True)
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+from redetur.cache import read_excel_cached, workbook_version
+from redetur.cube import SalesCube
+from redetur.schema import COLUNAS_LEITURA, concat_canonical, to_canonical
+
+# ================================================
+# CONJUNTO DE DADOS COMPARTILHADO ENTRE SESSÕES
+# ================================================
+
+
+class SharedDataset:
+    """Dados canônicos de uma versão da planilha, somente leitura.
+
+    Uma única instância é compartilhada por todas as sessões (via
+    st.cache_resource). `frame` devolve uma visão rasa, sem copiar os
+    dados: com o copy-on-write do pandas, qualquer alteração feita por uma
+    sessão gera cópia só dela e nunca chega às outras.
+    """
+
+    def __init__(self, frame, version, number, base=None, appended=None):
+        self._frame = frame
+        self.version = version  # hash curto do conteúdo da planilha
+        self.number = number    # 1, 2, 3... a cada recarga com conteúdo novo
+        self.loaded_at = time.time()
+        self.appended = appended  # linhas novas em relação à versão `base` (ingestão incremental)
+        self._base = base
+        self._cube = None
+        self._lock = threading.Lock()
+
+    @property
+    def frame(self):
+        return self._frame.copy(deep=False)
+
+    def __len__(self):
+        return len(self._frame)
+
+    def cube(self):
+        # Cubo desta versão; na ingestão incremental soma só as linhas novas ao cubo anterior
+        with self._lock:
+            if self._cube is None:
+                base = self._base
+                if base is not None and base._cube is not None:
+                    self._cube = base._cube.append(self.appended, version=self.version)
+                else:
+                    self._cube = SalesCube.from_frame(self._frame, version=self.version)
+                self._base = None  # não prende a versão anterior na memória
+            return self._cube
+
+
+class DatasetService:
+    """Entrega a versão atual dos dados e recarrega quando a planilha muda.
+
+    A checagem é feita por os.stat no máximo a cada `check_interval`
+    segundos; só quando tamanho ou mtime mudam o hash do conteúdo é
+    conferido e, se for outro, os dados são recarregados uma vez para o
+    servidor inteiro.
+
+    Com `ingest` (ex.: MonthlyStore.refresh ou MergedDataset.update) a
+    cada mudança só as linhas acrescentadas são lidas e somadas aos dados e
+    ao cubo da versão anterior; `ingest()` devolve {"novas", "completa", ...}
+    e "novas" None pede a releitura completa por `loader`.
+
+    `file_path` também pode ser uma lista de planilhas (base unida, ver
+    redetur.dataset); nesse caso `loader` e `version` são obrigatórios.
+    """
+
+    def __init__(self, file_path, sheet_name=0, loader=None, check_interval=2.0, ingest=None, version=None):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.check_interval = check_interval
+        self._loader = loader or (lambda: to_canonical(
+            read_excel_cached(file_path, sheet_name=sheet_name, columns=COLUNAS_LEITURA, required=["Agencias"])
+        ))
+        self._version = version or (lambda: workbook_version(file_path, sheet_name=sheet_name))
+        self._ingest_fn = ingest
+        self._current = None
+        self._stat = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0  # quantas vezes a planilha foi lida de fato
+
+    def current(self):
+        atual = self._current
+        if atual is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return atual
+        with self._lock:
+            paths = self.file_path if isinstance(self.file_path, (list, tuple)) else [self.file_path]
+            chave = tuple((stat.st_size, stat.st_mtime_ns) for stat in map(os.stat, paths))
+            self._checked_at = time.monotonic()
+            if self._current is not None and chave == self._stat:
+                return self._current
+            versao = self._version()
+            if self._current is None or versao != self._current.version:
+                numero = self._current.number + 1 if self._current is not None else 1
+                if self._ingest_fn is not None:
+                    self._current = self._ingest(versao, numero)
+                else:
+                    self._current = SharedDataset(self._loader(), versao, numero)
+                self.loads += 1
+            self._stat = chave
+            return self._current
+
+    def _ingest(self, versao, numero):
+        anterior = self._current
+        resultado = self._ingest_fn()
+        if resultado["completa"]:
+            return SharedDataset(resultado["novas"], versao, numero)
+        if anterior is None or resultado["novas"] is None:
+            # Primeira carga do processo (loja já em disco), loja atualizada por
+            # outro processo ou linhas antigas substituídas: relê tudo
+            return SharedDataset(self._loader(), versao, numero)
+        frame = concat_canonical([anterior._frame, resultado["novas"]])
+        base = anterior if anterior._cube is not None else None
+        return SharedDataset(frame, versao, numero, base=base, appended=resultado["novas"])
+
+    def invalidate(self):
+        # Força a conferência do arquivo na próxima chamada de current()
+        with self._lock:
+            self._stat = None
+            self._checked_at = 0.0
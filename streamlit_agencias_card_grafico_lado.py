@@ -3,23 +3,13 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 
+from redetur.relatorio import load_relatorio, to_wide
+
 # Carregar os dados
 @st.cache_data
 def load_data():
-    file_path = "Relatório de vendas agências x Fornecedores.xlsx"
-    excel_file = pd.ExcelFile(file_path)
-    sheet_names = excel_file.sheet_names
-    all_data = []
-    for sheet in sheet_names:
-        df = excel_file.parse(sheet)
-        df['Fornecedor'] = sheet
-        all_data.append(df)
-    df_combined = pd.concat(all_data, ignore_index=True)
-    df_combined = df_combined[~df_combined.iloc[:, 0].astype(str).str.contains("Agência:|nan", case=False, na=True)]
-    df_combined.columns = ['Agencia', 'Janeiro', 'Fevereiro', 'Março', 'Fornecedor']
-    for mes in ['Janeiro', 'Fevereiro', 'Março']:
-        df_combined[mes] = pd.to_numeric(df_combined[mes], errors='coerce')
-    return df_combined
+    # Agencia, Janeiro, Fevereiro, Março, Fornecedor (uma linha por agência em cada aba)
+    return to_wide(load_relatorio())
 
 df = load_data()
 
@@ -2,51 +2,18 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import unicodedata
 import base64
 import uuid
 
-def normalize_col(col_name):
-    col_name = str(col_name).strip().lower()
-    col_name = ''.join(c for c in unicodedata.normalize('NFD', col_name) if unicodedata.category(c) != 'Mn')
-    return col_name
+from redetur.relatorio import load_relatorio, to_wide
 
 @st.cache_data
 def load_data():
-    file_path = "Relatório de vendas agências x Fornecedores.xlsx"
-    excel_file = pd.ExcelFile(file_path)
-    sheet_names = excel_file.sheet_names
-    all_data = []
-
-    for sheet in sheet_names:
-        df = excel_file.parse(sheet)
-        header_row = df[df.iloc[:, 0].astype(str).str.contains("Agência", case=False, na=False)].index
-        if not header_row.empty:
-            header_index = header_row[0]
-            df.columns = df.iloc[header_index]
-            df = df[(header_index + 1):].copy()
-            df['Fornecedor'] = sheet
-            all_data.append(df)
-
-    df_combined = pd.concat(all_data, ignore_index=True)
-    df_combined.columns = [str(col).strip() for col in df_combined.columns]
-
-    agencia_col = None
-    for col in df_combined.columns:
-        if "agencia" in normalize_col(col):
-            agencia_col = col
-            break
-    if not agencia_col:
-        st.error("Coluna com nome semelhante a 'Agência' não encontrada.")
-        st.stop()
-
-    meses = [col for col in df_combined.columns if any(mes in normalize_col(col) for mes in ['janeiro','fevereiro','marco','abril','maio','junho','julho','agosto','setembro','outubro','novembro','dezembro'])]
-    df_final = df_combined[[agencia_col] + meses + ['Fornecedor']]
-
-    for mes in meses:
-        df_final[mes] = pd.to_numeric(df_final[mes], errors='coerce')
-
-    return df_final, agencia_col, meses
+    # Tabela longa (Agencia, Fornecedor, Mês/period, Valor) do redetur.relatorio;
+    # as páginas só fatiam e agregam, sem montar a tabela larga inteira
+    df_longo = load_relatorio()
+    meses = list(df_longo["Mês"].cat.remove_unused_categories().cat.categories)
+    return df_longo, "Agencia", meses
 
 # ============ APP MULTIPÁGINA ============
 
@@ -57,8 +24,9 @@ df, agencia_col, meses = load_data()
 meses_filtrados = st.sidebar.multiselect("Meses a exibir", meses, default=meses)
 
 if page == "Relatório por Agência":
-    agencia_selecionada = st.sidebar.selectbox("Agência", df[agencia_col].dropna().unique())
-    dados_agencia = df[df[agencia_col] == agencia_selecionada]
+    agencia_selecionada = st.sidebar.selectbox("Agência", list(df[agencia_col].unique()))
+    # Só a fatia da agência volta ao formato de um fornecedor por linha
+    dados_agencia = to_wide(df[df[agencia_col] == agencia_selecionada])
     dados_filtrados = dados_agencia[[agencia_col, 'Fornecedor'] + meses_filtrados]
 
     st.title(f"Relatório de Vendas - {agencia_selecionada}")
@@ -128,9 +96,8 @@ if page == "Relatório por Agência":
 elif page == "Comparativo de Agências":
     st.title("📊 Comparativo entre Agências")
 
-    df_agencia_total = df.copy()
-    df_agencia_total["Total"] = df_agencia_total[meses_filtrados].sum(axis=1)
-    comparativo = df_agencia_total.groupby(agencia_col)["Total"].sum().reset_index()
+    valores = df["Valor"].where(df["Mês"].isin(meses_filtrados))
+    comparativo = valores.groupby(df[agencia_col], observed=True).sum().reset_index(name="Total")
 
     fig_comp = go.Figure()
     fig_comp.add_trace(go.Bar(